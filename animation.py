@@ -2,12 +2,31 @@
 
 import pygame
 
+class RotationCache(object):
+    """ Rotated images and their collision masks for the frames of an
+    animation. Shared by every object that uses the animation. """
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, frameno, frame, angle):
+        """ Return (image, mask) for 'frame' rotated by 'angle' degrees,
+        rendering it the first time it is asked for. """
+        key = frameno, angle
+        entry = self.entries.get(key)
+        if entry is None:
+            image = pygame.transform.rotate(frame, angle)
+            entry = image, pygame.mask.from_surface(image)
+            self.entries[key] = entry
+        return entry
+
+
 class Animation(object):
     """ A description of an animation, including the frame sequence. """
     def __init__(self, ticks_per_frame=0, frames=None, loop=True):
         self.frames = frames or []
         self.ticks_per_frame = ticks_per_frame
         self.loop = loop
+        self.rotations = RotationCache()
 
     def append_frame(self, frame):
         """ Append a frame to the animation. """
@@ -25,6 +44,7 @@ class SingleFrameAnimation(object):
         if not isinstance(frame, pygame.Surface):
             raise TypeError('{} is not a pygame.Surface'.format(type(frame)))
         self.frame = frame
+        self.rotations = RotationCache()
 
     def get_view(self):
         return SingleFrameAnimationView(self)
@@ -62,24 +82,40 @@ class SingleFrameAnimationView(AnimationView):
     def __init__(self, animation):
         if not isinstance(animation, SingleFrameAnimation):
             raise TypeError('animation must be a SingleFrameAnimation')
+        self.animation = animation
+        self.frameno = 0
+        self.done = False
         self.frame = animation.frame
 
     def update(self):
         pass
 
-def load_image(filename):
-    return pygame.image.load(filename).convert_alpha()
+def prepare_image(image, atlas=None):
+    """ Convert a decoded image to display format, packed into 'atlas' if
+    one is given. Must be done on the main thread. """
+    image = image.convert_alpha()
+    if atlas:
+        image = atlas.add(image)
+    return image
 
-def load(dirname, fps, descr):
+def load_image(filename, atlas=None):
+    """ Load an image, packed into 'atlas' if one is given. """
+    return prepare_image(pygame.image.load(filename), atlas)
+
+def load(dirname, fps, descr, atlas=None):
     """ 
     Load an animation where 'dirname' contains image files and 'descr' is a
-    dictionary.
+    dictionary. With an 'atlas' the frames are subsurfaces of its pages.
     """
-    if len(descr['frames']) == 1:
-        return SingleFrameAnimation(load_image(dirname + '/' + \
-                                                   descr['frames'][0]))
+    return build(fps, descr, [load_image(dirname + '/' + frame, atlas)
+                              for frame in descr['frames']])
+
+def build(fps, descr, frames):
+    """ Make an animation from 'descr' and its already loaded 'frames'. """
+    if len(frames) == 1:
+        return SingleFrameAnimation(frames[0])
     animation = Animation(fps/descr.get('fps', 1), 
                           loop=descr.get('loop', True))
-    for frame in descr['frames']:
-        animation.append_frame(load_image(dirname + '/' + frame))
+    for frame in frames:
+        animation.append_frame(frame)
     return animation
@@ -0,0 +1,190 @@
+"""A single-file pack of every model, loadable without decoding images.
+
+The pack starts with MAGIC and the length of a JSON index, followed by the
+index and then the raw RGBA pixels of every frame. The index has each
+model's animation descriptors, with the frame file names replaced by the
+offset and size of the frame's pixels, and the content hash of every
+source file, so that a rebuild only has to decode the images that changed
+and a loader can tell when the pack is out of date.
+"""
+#
+# Copyright (c) Gordon McNutt, 2013
+#
+
+import animation
+import hashlib
+import json
+import mmap
+import os
+import pygame
+import struct
+
+MAGIC = b'SDPK0001'
+LENGTH = struct.Struct('<I')
+ALIGN = 16  # pixel data starts at a multiple of this
+
+
+def file_hash(path):
+    """Return the hex SHA-1 of the contents of the file at 'path'."""
+    with open(path, 'rb') as source:
+        return hashlib.sha1(source.read()).hexdigest()
+
+
+def _data_start(index_length):
+    end = len(MAGIC) + LENGTH.size + index_length
+    return end + (-end % ALIGN)
+
+
+def read_index(data):
+    """Return (index, offset of the pixel data) from the pack contents
+    'data', which may be an mmap. Raises ValueError if 'data' is not a
+    whole pack."""
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError('not an asset pack')
+    start = len(MAGIC)
+    if len(data) < start + LENGTH.size:
+        raise ValueError('truncated asset pack')
+    length = LENGTH.unpack(data[start:start + LENGTH.size])[0]
+    start += LENGTH.size
+    index = json.loads(data[start:start + length].decode('utf-8'))
+    data_start = _data_start(length)
+    for frame in index['frames'].values():
+        width, height = frame['size']
+        if data_start + frame['offset'] + width * height * 4 > len(data):
+            raise ValueError('truncated asset pack')
+    return index, data_start
+
+
+def _open(path):
+    """Return a read-only mmap of the file at 'path'. Raises ValueError if
+    the file is empty."""
+    with open(path, 'rb') as pack:
+        return mmap.mmap(pack.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def source_hashes(modeldir):
+    """Return the content hash of every file the models under 'modeldir'
+    are made from, by path relative to 'modeldir'."""
+    sources = {}
+    for name in sorted(os.listdir(modeldir)):
+        descr_path = os.path.join(modeldir, name, 'model.json')
+        if os.path.exists(descr_path):
+            sources[name + '/model.json'] = file_hash(descr_path)
+            descr = json.loads(open(descr_path).read())
+            for anim in descr['animations'].values():
+                for frame in anim['frames']:
+                    key = name + '/' + frame
+                    sources[key] = file_hash(os.path.join(modeldir, key))
+    return sources
+
+
+def build(modeldir, path, force=False):
+    """Compile every model under 'modeldir' into a pack at 'path'.
+
+    Frames whose image files hash the same as when the existing pack was
+    built are copied from it rather than decoded again. Unless 'force' is
+    set nothing is written if no source file has changed. Returns the
+    number of images (decoded, reused), or None if the pack was up to date.
+
+    """
+    sources = source_hashes(modeldir)
+    old, old_data, old_start = {}, None, 0
+    if os.path.exists(path):
+        try:
+            old_data = _open(path)
+            old, old_start = read_index(old_data)
+        except ValueError:
+            old = {}
+    if not force and old.get('sources') == sources:
+        old_data.close()
+        return None
+    old_frames = old.get('frames', {})
+
+    models = {}
+    frames = {}
+    blobs = []
+    offset = 0
+    decoded = reused = 0
+    for name in sorted(sources):
+        if not name.endswith('/model.json'):
+            continue
+        model_name = name.split('/')[0]
+        descr = json.loads(open(os.path.join(modeldir, name)).read())
+        animations = {}
+        for key, anim in descr['animations'].items():
+            entries = []
+            for frame in anim['frames']:
+                source = model_name + '/' + frame
+                digest = sources[source]
+                if digest not in frames:
+                    cached = old_frames.get(digest)
+                    if cached:
+                        size = cached['size']
+                        start = old_start + cached['offset']
+                        pixels = old_data[start:start +
+                                          size[0] * size[1] * 4]
+                        reused += 1
+                    else:
+                        image = pygame.image.load(
+                            os.path.join(modeldir, source))
+                        size = list(image.get_size())
+                        pixels = pygame.image.tostring(image, 'RGBA')
+                        decoded += 1
+                    frames[digest] = {'offset': offset, 'size': size}
+                    blobs.append(pixels)
+                    offset += len(pixels)
+                entries.append(digest)
+            animations[key] = dict(anim, frames=entries)
+        models[model_name] = {'animations': animations}
+    if old_data:
+        old_data.close()
+
+    index = json.dumps({'sources': sources, 'frames': frames,
+                        'models': models}, sort_keys=True).encode('utf-8')
+    with open(path, 'wb') as pack:
+        pack.write(MAGIC)
+        pack.write(LENGTH.pack(len(index)))
+        pack.write(index)
+        pack.write(b'\0' * (_data_start(len(index)) - pack.tell()))
+        for pixels in blobs:
+            pack.write(pixels)
+    return decoded, reused
+
+
+def load(path, fps, atlas=None, modeldir=None):
+    """Return a dictionary of every model in the pack at 'path', by name.
+
+    Each frame is made straight from its pixels in the mapped file and
+    converted to display format, packed into 'atlas' if one is given. Needs
+    a display mode to be set first.
+
+    Raises ValueError if the file is not a whole pack or, given 'modeldir',
+    if it was not built from the files now under 'modeldir'.
+
+    """
+    data = _open(path)
+    try:
+        index, start = read_index(data)
+        if modeldir is not None and \
+                index.get('sources') != source_hashes(modeldir):
+            raise ValueError('asset pack is out of date')
+        images = {}
+        for digest, frame in index['frames'].items():
+            width, height = frame['size']
+            offset = start + frame['offset']
+            image = pygame.image.frombuffer(
+                data[offset:offset + width * height * 4], (width, height),
+                'RGBA').convert_alpha()
+            if atlas:
+                image = atlas.add(image)
+            images[digest] = image
+    finally:
+        data.close()
+    models = {}
+    for name, descr in index['models'].items():
+        models[name] = dict(
+            (key, animation.build(fps, anim,
+                                  [images[digest]
+                                   for digest in anim['frames']]))
+            for key, anim in descr['animations'].items())
+    return models
@@ -0,0 +1,67 @@
+"""Packing many small images into a few large surfaces."""
+#
+# Copyright (c) Gordon McNutt, 2013
+#
+
+import pygame
+
+DEFAULT_PAGE_SIZE = 512, 512
+PADDING = 1  # pixels left clear around each image
+
+
+class Atlas(object):
+    """Packs images onto shared surfaces ('pages') with a shelf packer.
+
+    Each page is filled with horizontal shelves as tall as the first image
+    placed on them; images go on the first shelf that is tall enough and
+    has room, else on a new shelf, else on a new page. add() returns a
+    subsurface of the page, which can be blitted, rotated and masked like
+    the original image.
+
+    """
+    def __init__(self, page_size=DEFAULT_PAGE_SIZE):
+        self.page_size = page_size
+        self.pages = []
+        self.shelves = []  # per page: list of [top, height, next free x]
+
+    def _new_page(self, size):
+        page = pygame.Surface(size, pygame.SRCALPHA, 32).convert_alpha()
+        page.fill((0, 0, 0, 0))
+        self.pages.append(page)
+        self.shelves.append([])
+        return len(self.pages) - 1
+
+    def _place(self, width, height):
+        """Return (page index, topleft) of free room for an image of
+        'width' by 'height' pixels, including padding."""
+        page_width, page_height = self.page_size
+        if width > page_width or height > page_height:
+            # Too big to share a page.
+            return self._new_page((width, height)), (0, 0)
+        for index, shelves in enumerate(self.shelves):
+            if self.pages[index].get_size() != self.page_size:
+                continue
+            for shelf in shelves:
+                top, shelf_height, x = shelf
+                if height <= shelf_height and x + width <= page_width:
+                    shelf[2] += width
+                    return index, (x, top)
+            bottom = shelves[-1][0] + shelves[-1][1] if shelves else 0
+            if bottom + height <= page_height:
+                shelves.append([bottom, height, width])
+                return index, (0, bottom)
+        index = self._new_page(self.page_size)
+        self.shelves[index].append([0, height, width])
+        return index, (0, 0)
+
+    def add(self, image):
+        """Copy 'image' into the atlas and return the subsurface that holds
+        it."""
+        width, height = image.get_size()
+        index, topleft = self._place(width + 2 * PADDING,
+                                     height + 2 * PADDING)
+        area = pygame.Rect(topleft[0] + PADDING, topleft[1] + PADDING,
+                           width, height)
+        page = self.pages[index]
+        page.blit(image, area, special_flags=pygame.BLEND_RGBA_MAX)
+        return page.subsurface(area)
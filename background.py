@@ -1,17 +1,28 @@
+""" Backgrounds paint whatever is behind the sprites. """
+#
+# Copyright (c) Gordon McNutt, 2013
+#
 
-def align_horz(rect, align):
-    """ Widen 'rect' leftwards to a multile of 'align'. """
-    lmargin = rect.left % align
-    rmargin = align - (rect.right % align)
-    rect.left -= lmargin
-    rect.width += (lmargin + rmargin)
+import pygame
+import random
+
+# Star layers of StarfieldBackground, farthest first: (fraction of the view's
+# movement the layer moves by, stars per tile, star colour).
+DEFAULT_LAYERS = ((0.1, 60, (80, 80, 96)),
+                  (0.25, 30, (160, 160, 176)),
+                  (0.5, 12, (255, 255, 255)))
+DEFAULT_TILE_SIZE = 256, 256
+
+
+def tile(image, size):
+    """ Return a surface of 'size' covered with copies of 'image'. """
+    tiled = pygame.Surface(size).convert()
+    width, height = image.get_size()
+    for x in range(0, size[0], width):
+        for y in range(0, size[1], height):
+            tiled.blit(image, (x, y))
+    return tiled
 
-def align_vert(rect, align):
-    """ Heighten 'rect' upwards to a multile of 'align'. """
-    lmargin = rect.top % align
-    rmargin = align - (rect.bottom % align)
-    rect.top -= lmargin
-    rect.height += (lmargin + rmargin)
 
 class Background(object):
     """ Abstract base class for background renderers. """
@@ -21,6 +32,12 @@ class Background(object):
     def blit(self, surf, rect):
         pass
 
+    def view(self, topleft):
+        """ Tell the background where the view is on the map. Returns true
+        if the background has moved, so the whole screen needs repainting.
+        """
+        return False
+
 class FillBackground(Background):
 
     def __init__(self, color=(255, 255, 255), *args, **kwargs):
@@ -32,21 +49,94 @@ class FillBackground(Background):
 
 
 class TextureBackground(Background):
+    """ Tiles an image across the screen.
 
-    def __init__(self, fname, *args, **kwargs):
+    The image is tiled once onto a surface one tile larger than the screen
+    each way, so that any rect can be painted with a single blit from it,
+    offset by the rect's position modulo the tile size.
+
+    """
+    def __init__(self, path, *args, **kwargs):
         super(TextureBackground, self).__init__(*args, **kwargs)
-        self.image = pygame.image.load(IMAGEDIR + fname).convert_alpha()
+        self.image = pygame.image.load(path).convert_alpha()
         self.rect = self.image.get_rect()
+        self.tiled = None
+
+    def tile(self, size):
+        """ Make the pre-tiled surface for a screen of 'size'. """
+        width, height = self.rect.size
+        self.tiled = tile(self.image, (size[0] + width, size[1] + height))
+
+    def blit(self, surf, rect):
+        width, height = self.rect.size
+        if self.tiled is None or \
+                self.tiled.get_width() < surf.get_width() + width or \
+                self.tiled.get_height() < surf.get_height() + height:
+            self.tile(surf.get_size())
+        area = pygame.Rect(rect.left % width, rect.top % height,
+                           rect.width, rect.height)
+        surf.blit(self.tiled, rect, area)
 
-    def blit(self, surf, dest):
-        dest2 = dest.copy()
-        align_horz(dest2, self.rect.width)
-        align_vert(dest2, self.rect.height)
-        area = self.rect.copy().move(dest2.topleft)
-        for row in range(dest2.height/area.height):
-            for col in range(dest2.width/area.width):
-                surf.blit(self.image, area)
-                area.left += area.width
-            area.top += area.height
-            area.left = dest2.left
 
+class StarfieldBackground(Background):
+    """ Layers of stars that scroll at different speeds.
+
+    Each layer's stars are drawn once onto a tile that wraps around, and
+    the tile is pre-tiled as for TextureBackground. A layer moves by its
+    fraction of the view's movement, so painting a rect costs one blit per
+    layer however many stars there are. The farthest layer is opaque and
+    the others are colour-keyed over it.
+
+    """
+    def __init__(self, layers=DEFAULT_LAYERS, tile_size=DEFAULT_TILE_SIZE,
+                 color=(0, 0, 0), seed=None, *args, **kwargs):
+        super(StarfieldBackground, self).__init__(*args, **kwargs)
+        self.layers = layers
+        self.tile_size = tile_size
+        self.color = color
+        self.seed = seed
+        self.tiled = None
+        self.offsets = [(0, 0)] * len(layers)
+
+    def make_tiles(self):
+        """ Return a wrapping tile of stars for each layer. """
+        rand = random.Random(self.seed)
+        width, height = self.tile_size
+        tiles = []
+        for fraction, stars, color in self.layers:
+            image = pygame.Surface(self.tile_size).convert()
+            image.fill(self.color)
+            for i in range(stars):
+                image.set_at((rand.randrange(width), rand.randrange(height)),
+                             color)
+            tiles.append(image)
+        return tiles
+
+    def tile(self, size):
+        """ Make the pre-tiled layers for a screen of 'size'. """
+        width, height = self.tile_size
+        self.tiled = []
+        for i, image in enumerate(self.make_tiles()):
+            tiled = tile(image, (size[0] + width, size[1] + height))
+            if i:
+                tiled.set_colorkey(self.color, pygame.RLEACCEL)
+            self.tiled.append(tiled)
+
+    def view(self, topleft):
+        offsets = [(int(topleft[0] * fraction), int(topleft[1] * fraction))
+                   for fraction, stars, color in self.layers]
+        moved = offsets != self.offsets
+        self.offsets = offsets
+        return moved
+
+    def blit(self, surf, rect):
+        width, height = self.tile_size
+        if self.tiled is None or \
+                self.tiled[0].get_width() < surf.get_width() + width or \
+                self.tiled[0].get_height() < surf.get_height() + height:
+            self.tile(surf.get_size())
+        for tiled, offset in zip(self.tiled, self.offsets):
+            area = pygame.Rect((rect.left + offset[0]) % width,
+                               (rect.top + offset[1]) % height,
+                               rect.width, rect.height)
+            surf.blit(tiled, rect, area)
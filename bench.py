@@ -0,0 +1,160 @@
+"""Benchmark Level.update on fixed, seeded scenarios.
+
+Usage: bench.py [--frames N] [--warmup N] [--sizes N,N,...]
+                [--scenarios NAME,...] [--output FILE]
+
+Each scenario is built at each size with the same random seed, run
+headless against an offscreen screen, and timed frame by frame. The
+percentiles of the whole frame and of each phase of Level.update are
+printed and written as JSON to the output file so runs can be compared.
+
+A size is a scale rather than an object count: the factories scenario
+builds one factory per ten, for instance. What each run built is printed
+with its results and recorded as 'built'.
+"""
+#
+# Copyright (c) Gordon McNutt, 2013
+#
+
+import argparse
+import headless
+import json
+import perf
+import platform
+import pygame
+import random
+import sprite
+import stardog
+import time
+import timeit
+import vector
+
+PERCENTILES = (50, 90, 99)
+
+
+def add_shot_swarm(level, num):
+    """Top the level up to 'num' player shots flying in random directions
+    from around the player."""
+    num -= len(level.player_shots)
+    if num <= 0:
+        return
+    directions = vector.batch_from_angle([random.randint(0, 359)
+                                          for i in range(num)])
+    velocities = vector.batch_scalar_multiply(directions, 10).tolist()
+    offsets = vector.batch_subtract([vector.randint(200, 200)
+                                     for i in range(num)], (100, 100))
+    positions = vector.batch_add(offsets,
+                                 level.player.maprect.center).tolist()
+    for velocity, position in zip(velocities, positions):
+        level.add(sprite.PlayerShot.spawn(velocity=velocity), position)
+
+
+# Each builder fills the level for a size and describes what it built.
+
+def build_asteroids(level, size):
+    stardog.add_asteroids(level, size)
+    return '{} asteroids'.format(size)
+
+
+def build_factories(level, size):
+    factories = max(size // 10, 1)
+    stardog.add_tick_factories(level, factories)
+    return '{} tick factories'.format(factories)
+
+
+# name: (builder, shots to keep in flight per unit of size)
+SCENARIOS = {
+    'asteroids': (build_asteroids, 0),
+    'factories': (build_factories, 0),
+    'shots': (build_asteroids, 0.1),
+}
+
+
+def summarize(samples):
+    """Return the percentiles, mean and max of 'samples' in milliseconds."""
+    summary = dict(('p{}'.format(pct), perf.percentile(samples, pct) * 1000)
+                   for pct in PERCENTILES)
+    summary['mean'] = sum(samples) / len(samples) * 1000
+    summary['max'] = max(samples) * 1000
+    return summary
+
+
+def run_scenario(screen, name, size, frames, warmup, seed):
+    """Build scenario 'name' at 'size' and time 'frames' frames after
+    'warmup' untimed ones. Returns a dictionary of results."""
+    builder, shots = SCENARIOS[name]
+    random.seed(seed)
+    level = headless.make_level(size=screen.get_size(), screen=screen)
+    level.start()
+    built = builder(level, size)
+    swarm = int(size * shots)
+    if swarm:
+        built += ', {} shots in flight'.format(swarm)
+    start_objects = len(level.all)
+    totals = []
+    phases = dict((phase, []) for phase in perf.PHASES)
+    for frame in range(warmup + frames):
+        if swarm:
+            add_shot_swarm(level, swarm)
+        start = timeit.default_timer()
+        level.update()
+        elapsed = timeit.default_timer() - start
+        if frame >= warmup:
+            totals.append(elapsed)
+            for phase, seconds in level.timer.phases.items():
+                phases[phase].append(seconds)
+    return {'scenario': name,
+            'size': size,
+            'built': built,
+            'objects_start': start_objects,
+            'objects_end': len(level.all),
+            'frame_ms': summarize(totals),
+            'phase_ms': dict((phase, summarize(samples))
+                             for phase, samples in phases.items())}
+
+
+def report(result):
+    frame = result['frame_ms']
+    print('{scenario:>10} {size:>6} {objects_start:>6}->{objects_end:<6}'
+          .format(**result) +
+          ' frame p50 {p50:7.2f} p90 {p90:7.2f} p99 {p99:7.2f} ms'
+          .format(**frame))
+    print(' ' * 25 + result['built'])
+    print(' ' * 25 + '  '.join(
+        '{} {:.2f}'.format(phase, result['phase_ms'][phase]['p50'])
+        for phase in perf.PHASES))
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Benchmark Level.update')
+    parser.add_argument('--frames', type=int, default=300,
+                        help='timed frames per scenario')
+    parser.add_argument('--warmup', type=int, default=30,
+                        help='untimed frames before timing starts')
+    parser.add_argument('--sizes', default='100,1000,10000',
+                        help='comma-separated scenario sizes')
+    parser.add_argument('--scenarios', default=','.join(sorted(SCENARIOS)),
+                        help='comma-separated scenario names')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', default='bench.json',
+                        help='file to write the JSON results to')
+    args = parser.parse_args()
+
+    screen = headless.init(stardog.SIZE)
+    stardog.load_models()
+    results = []
+    for name in args.scenarios.split(','):
+        for size in [int(size) for size in args.sizes.split(',')]:
+            result = run_scenario(screen, name, size, args.frames,
+                                  args.warmup, args.seed)
+            report(result)
+            results.append(result)
+    with open(args.output, 'w') as output:
+        json.dump({'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                   'python': platform.python_version(),
+                   'pygame': pygame.version.ver,
+                   'frames': args.frames,
+                   'warmup': args.warmup,
+                   'seed': args.seed,
+                   'results': results}, output, indent=2, sort_keys=True)
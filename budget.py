@@ -0,0 +1,122 @@
+"""Limits on the number of sprites in a level."""
+#
+# Copyright (c) Gordon McNutt, 2013
+#
+
+import collections
+import pygame
+
+# What to do with a sprite added when there's no room for it.
+DEFER = 'defer'  # add it once there is room
+DROP = 'drop'  # forget it
+EVICT = 'evict'  # make room by pushing out a less important sprite
+
+MAX_WAITING = 64  # most deferred sprites kept; the oldest go first
+
+
+class EntityBudget(object):
+    """Caps the sprites in a level, in total and per class.
+
+    Each sprite class says how much its sprites are worth keeping with
+    'budget_priority', or None to be exempt, and what to do with one that
+    doesn't fit with 'over_budget'. The level asks refuses() before adding
+    a sprite and admit()s the ones it adds. Killed sprites drop out of the
+    counts on their own.
+
+    'limit' caps the budgeted sprites in total and 'class_limits' maps
+    classes to caps of their own; None means no cap. How often sprites were
+    deferred, dropped and evicted is counted per class name in
+    'pressure_counts'.
+
+    """
+    def __init__(self, limit=None, class_limits=None):
+        self.limit = limit
+        self.class_limits = dict(class_limits or {})
+        self.members = pygame.sprite.Group()
+        self.classes = {}  # class: group of its budgeted sprites
+        self.waiting = collections.deque()  # deferred (sprite, maploc)
+        self.pressure_counts = dict((outcome, collections.Counter())
+                                    for outcome in (DEFER, DROP, EVICT))
+
+    def __len__(self):
+        return len(self.members)
+
+    def count(self, cls):
+        """Return the number of budgeted sprites of class 'cls'."""
+        group = self.classes.get(cls)
+        return len(group) if group else 0
+
+    def class_full(self, cls):
+        limit = self.class_limits.get(cls)
+        return limit is not None and self.count(cls) >= limit
+
+    def full(self):
+        return self.limit is not None and len(self.members) >= self.limit
+
+    def refuses(self, sprite):
+        """Return true if there is no room for 'sprite'."""
+        return self.refuses_class(type(sprite))
+
+    def refuses_class(self, cls):
+        """Return true if there is no room for a sprite of class 'cls', so
+        that spawners can hold off before making one."""
+        return cls.budget_priority is not None and \
+            (self.full() or self.class_full(cls))
+
+    def admit(self, sprite):
+        """Count 'sprite', which is being added to the level."""
+        if sprite.budget_priority is not None:
+            self.members.add(sprite)
+            cls = type(sprite)
+            if cls not in self.classes:
+                self.classes[cls] = pygame.sprite.Group()
+            self.classes[cls].add(sprite)
+
+    def victim(self, sprite, center, exclude=()):
+        """Return the sprite to push out to make room for 'sprite', or None.
+
+        If its class is full only one of the same class will do; otherwise
+        it is taken from the least important class less important than
+        'sprite' that has any. Of those the one farthest from map position
+        'center' is chosen. Sprites in 'exclude', such as the one spawning
+        'sprite', are never chosen.
+
+        """
+        cls = type(sprite)
+        if self.class_full(cls):
+            groups = [self.classes[cls]]
+        else:
+            groups = [group for other, group in
+                      sorted(self.classes.items(),
+                             key=lambda item: item[0].budget_priority)
+                      if other.budget_priority < sprite.budget_priority]
+        x, y = center
+
+        def distance(other):
+            ox, oy = other.maprect.center
+            return (ox - x) ** 2 + (oy - y) ** 2
+        for group in groups:
+            candidates = [other for other in group if other not in exclude]
+            if candidates:
+                return max(candidates, key=distance)
+        return None
+
+    def defer(self, sprite, maploc):
+        """Keep 'sprite' to add at 'maploc' once there is room."""
+        if len(self.waiting) == MAX_WAITING:
+            self.waiting.popleft()
+        self.waiting.append((sprite, maploc))
+
+    def record(self, outcome, sprite):
+        """Count one DEFER, DROP or EVICT of 'sprite'."""
+        self.pressure_counts[outcome][type(sprite).__name__] += 1
+
+    def pressure(self):
+        """Return how full the fullest limit is, from 0 to 1."""
+        ratios = [0.0]
+        if self.limit:
+            ratios.append(len(self.members) / float(self.limit))
+        for cls, limit in self.class_limits.items():
+            if limit:
+                ratios.append(self.count(cls) / float(limit))
+        return min(max(ratios), 1.0)
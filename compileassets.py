@@ -0,0 +1,38 @@
+"""Compile the models into one asset pack for fast loading.
+
+Usage: compileassets.py [--models DIR] [--output FILE] [--force]
+
+Decodes the frames of every model under the models directory and writes
+them, with the models' animation descriptors, to a single pack that the
+game maps into memory at startup instead of decoding PNG files. Only
+images that changed since the last build are decoded again.
+"""
+#
+# Copyright (c) Gordon McNutt, 2013
+#
+
+import argparse
+import assetpack
+import os
+
+ROOTDIR = os.path.dirname(os.path.abspath(__file__))
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Build the asset pack')
+    parser.add_argument('--models', default=os.path.join(ROOTDIR, 'models'),
+                        help='directory of models to compile')
+    parser.add_argument('--output', default=os.path.join(ROOTDIR,
+                                                         'models.pack'),
+                        help='file to write the pack to')
+    parser.add_argument('--force', default=False, action='store_true',
+                        help='rebuild even if nothing has changed')
+    args = parser.parse_args()
+
+    result = assetpack.build(args.models, args.output, args.force)
+    if result is None:
+        print('{} is up to date'.format(args.output))
+    else:
+        print('wrote {}: {} images decoded, {} reused'.format(
+            args.output, *result))
@@ -0,0 +1,42 @@
+"""Sources of player input."""
+#
+# Copyright (c) Gordon McNutt, 2013
+#
+
+import pygame
+
+
+class MouseControls(object):
+    """Reads the player's controls from the real mouse and keyboard."""
+
+    def pointer(self):
+        """Return the screen position the ship steers toward."""
+        return pygame.mouse.get_pos()
+
+    def firing(self):
+        """Return True while the fire button is held down."""
+        return pygame.mouse.get_pressed()[0]
+
+    def thrusting(self):
+        """Return True unless the player is coasting (shift held down)."""
+        return not (pygame.KMOD_SHIFT & pygame.key.get_mods())
+
+
+class ScriptedControls(object):
+    """Controls set by the caller instead of read from devices. Used to drive
+    the ship when running without a display. Change the attributes between
+    ticks to steer."""
+
+    def __init__(self, pos=(0, 0), fire=False, thrust=True):
+        self.pos = pos
+        self.fire = fire
+        self.thrust = thrust
+
+    def pointer(self):
+        return self.pos
+
+    def firing(self):
+        return self.fire
+
+    def thrusting(self):
+        return self.thrust
@@ -1,10 +1,13 @@
 #
 # Copyright (c) Gordon McNutt, 2013
 #
+import collections
 import json
 import os
 import pygame
 
+DEFAULT_CACHE_SIZE = 256  # rendered strings kept by each ImageFont
+
 
 class Font(object):
     """ Abstract base class which defines the required fields and methods for
@@ -21,30 +24,68 @@ class Font(object):
 
 
 class ImageFont(Font):
-    """A Font from an image."""
+    """A Font from an image.
+
+    Each string is rendered once to a surface of its own, which is kept in
+    a least-recently-used cache of 'cache_size' entries keyed on the text
+    and the size of the rect it was written in. Writing it again is then a
+    single blit.
+
+    """
 
-    def __init__(self, image, rects):
+    def __init__(self, image, rects, cache_size=DEFAULT_CACHE_SIZE):
         """ Make a font from Surface 'image', where the position of each letter
         is given by a Rect in 'rects', in ASCII order. """
         self.image = image
         self.rects = rects
         self.max_width = max([r.width for r in rects.values()])
         self.max_height = max([r.height for r in rects.values()])
+        self.cache_size = cache_size
+        self.cache = collections.OrderedDict()
 
-    def write(self, surf, rect, text):
-        """ Write 'text' onto 'surf' within rectangle 'rect'. """
+    def _glyphs(self, text, rect):
+        """ Yield (area of the image, destination rect) for each character of
+        'text' that fits in 'rect'. """
         dest = rect.copy()
         for char in text:
             area = self.rects[char]
             dest.size = area.size
             if rect.contains(dest):
-                surf.blit(self.image, dest, area)
+                yield area, dest.copy()
             if char == '\n':
                 dest.top += dest.height
                 dest.left = rect.left
             else:
                 dest.left += dest.width
 
+    def render(self, text, size):
+        """ Return (surface, offset) with 'text' rendered as it would be
+        written in a rect of 'size' at the origin, cropped to the characters
+        and offset from the origin by 'offset'. """
+        glyphs = list(self._glyphs(text, pygame.Rect((0, 0), size)))
+        if not glyphs:
+            return None, (0, 0)
+        bounds = glyphs[0][1].unionall([dest for area, dest in glyphs])
+        image = pygame.Surface(bounds.size, pygame.SRCALPHA, 32)
+        image.fill((0, 0, 0, 0))
+        for area, dest in glyphs:
+            image.blit(self.image, dest.move(-bounds.left, -bounds.top), area)
+        return image, bounds.topleft
+
+    def write(self, surf, rect, text):
+        """ Write 'text' onto 'surf' within rectangle 'rect'. """
+        key = text, rect.size
+        cache = self.cache
+        entry = cache.pop(key, None)
+        if entry is None:
+            entry = self.render(text, rect.size)
+            if len(cache) >= self.cache_size:
+                cache.popitem(last=False)
+        cache[key] = entry
+        image, offset = entry
+        if image:
+            surf.blit(image, rect.move(offset).topleft)
+
     def get_dims(self, char):
         return self.rects[char]
 
@@ -57,14 +98,14 @@ class AfterFont(ImageFont):
         descr = json.loads(open(jsonfile).read())
         image = pygame.image.load(os.path.join(imagedir,
                                                descr['image_filename']))
+        image = image.convert_alpha()
         rects = {}
         for k, v in descr['rects'].items():
             rects[k] = pygame.Rect(v)
         super(AfterFont, self).__init__(image, rects)
 
-    def write(self, surf, rect, text):
-        text = text.upper()
-        return super(AfterFont, self).write(surf, rect, text)
+    def render(self, text, size):
+        return super(AfterFont, self).render(text.upper(), size)
 
     def get_dims(self, char):
         return super(AfterFont, self).get_dims(char.upper())
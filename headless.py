@@ -0,0 +1,88 @@
+"""Run the Stardog simulation without a display or real input devices.
+
+Usage: headless.py [--ticks N] [--asteroids N] [--factories N] [--render]
+
+Steps a level as fast as it will go and reports the tick rate. Without
+--render nothing is drawn at all; with it the level draws to an offscreen
+surface through the SDL dummy video driver.
+"""
+#
+# Copyright (c) Gordon McNutt, 2013
+#
+
+import argparse
+import os
+import timeit
+
+# Must be set before pygame initializes its display.
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import background
+import controls
+import level
+import pygame
+import random
+import sprite
+import stardog
+
+
+def init(size=(1, 1)):
+    """Initialize pygame without a real display. A display mode is still set
+    because images must be converted to display format when models load."""
+    pygame.init()
+    return pygame.display.set_mode(size)
+
+
+def make_level(size=stardog.SIZE, screen=None, ship_controls=None):
+    """Make a level with a player ship driven by 'ship_controls' (default:
+    scripted controls that sit still). Without a 'screen' the level does no
+    drawing."""
+    lvl = level.Level(screen=screen, fps=stardog.FPS, size=size,
+                      bgd=background.FillBackground((0, 0, 0)))
+    ship_controls = ship_controls or controls.ScriptedControls(
+        pos=lvl.rect.center)
+    lvl.add(sprite.PlayerShip(controls=ship_controls), lvl.rect.center)
+    lvl.view(lvl.player)
+    return lvl
+
+
+def run(lvl, ticks):
+    """Update 'lvl' up to 'ticks' times, as fast as possible, stopping early
+    if the level ends. Returns (ticks run, seconds elapsed)."""
+    start = timeit.default_timer()
+    count = 0
+    while count < ticks and lvl:
+        lvl.update()
+        count += 1
+    return count, timeit.default_timer() - start
+
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Run the game headless')
+    parser.add_argument('--ticks', type=int, default=3600,
+                        help='number of ticks to run')
+    parser.add_argument('--asteroids', type=int, default=100,
+                        help='number of big asteroids')
+    parser.add_argument('--factories', type=int, default=10,
+                        help='number of tick factories')
+    parser.add_argument('--render', default=False, action='store_true',
+                        help='draw to an offscreen surface')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='random seed')
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    if args.render:
+        screen = init(stardog.SIZE)
+    else:
+        screen = None
+        init()
+    stardog.load_models()
+    lvl = make_level(screen=screen)
+    lvl.start()
+    stardog.add_tick_factories(lvl, args.factories)
+    stardog.add_asteroids(lvl, args.asteroids)
+    count, elapsed = run(lvl, args.ticks)
+    print('{} ticks in {:.3f}s: {:.0f} ticks/s, {} objects'.format(
+        count, elapsed, count / elapsed, len(lvl.all)))
@@ -0,0 +1,125 @@
+"""Struct-of-arrays storage for the motion of simple sprites."""
+#
+# Copyright (c) Gordon McNutt, 2013
+#
+
+import numpy
+import pygame
+
+DEFAULT_CAPACITY = 256
+
+
+class KinematicsStore(pygame.sprite.AbstractGroup):
+    """A sprite group that keeps the position, velocity, angle and angular
+    velocity of its sprites in NumPy arrays and advances them all in one
+    step per tick.
+
+    Each sprite gets a row (its 'slot') in the arrays. Positions are the
+    floating-point centers of the sprites' maprects. The rects themselves
+    are only brought up to date by sync(), so that sprites nobody looks at
+    cost nothing but their share of the array operations.
+
+    """
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        super(KinematicsStore, self).__init__()
+        self.pos = numpy.zeros((capacity, 2))
+        self.vel = numpy.zeros((capacity, 2))
+        self.angle = numpy.zeros(capacity)
+        self.spin = numpy.zeros(capacity)
+        # Map cell of each sprite's center when its rects were last synced.
+        self.cells = numpy.zeros((capacity, 2), dtype=int)
+        self.used = numpy.zeros(capacity, dtype=bool)
+        # Map colour of each sprite that has one, for the minimap.
+        self.colors = numpy.zeros((capacity, 3), dtype=numpy.uint8)
+        self.colored = numpy.zeros(capacity, dtype=bool)
+        self.slots = [None] * capacity
+        self.free = list(range(capacity - 1, -1, -1))
+
+    def _grow(self):
+        """Double the capacity of the arrays."""
+        old = len(self.slots)
+
+        def grow(array):
+            shape = (old,) + array.shape[1:]
+            return numpy.concatenate((array, numpy.zeros(shape,
+                                                         array.dtype)))
+        self.pos = grow(self.pos)
+        self.vel = grow(self.vel)
+        self.angle = grow(self.angle)
+        self.spin = grow(self.spin)
+        self.cells = grow(self.cells)
+        self.used = grow(self.used)
+        self.colors = grow(self.colors)
+        self.colored = grow(self.colored)
+        self.slots += [None] * old
+        self.free = list(range(2 * old - 1, old - 1, -1)) + self.free
+
+    def add_internal(self, sprite, *args):
+        if not self.free:
+            self._grow()
+        slot = self.free.pop()
+        self.pos[slot] = sprite.maprect.center
+        self.vel[slot] = sprite._velocity
+        self.angle[slot] = sprite._angle
+        self.spin[slot] = sprite._angular_velocity
+        self.cells[slot] = (-1 << 30, -1 << 30)  # force the first sync
+        self.used[slot] = True
+        color = getattr(sprite, 'color', None)
+        self.colored[slot] = color is not None
+        if color is not None:
+            self.colors[slot] = color
+        self.slots[slot] = sprite
+        self.spritedict[sprite] = slot
+        sprite.kinematics = self
+        sprite.slot = slot
+
+    def remove_internal(self, sprite):
+        """Hand the sprite its motion back and free its slot."""
+        slot = self.spritedict.pop(sprite)
+        self.sync_slot(slot)
+        sprite._velocity = self.vel[slot].tolist()
+        sprite._angle = float(self.angle[slot])
+        sprite._angular_velocity = float(self.spin[slot])
+        sprite.kinematics = None
+        sprite.slot = None
+        self.vel[slot] = 0
+        self.spin[slot] = 0
+        self.used[slot] = False
+        self.colored[slot] = False
+        self.slots[slot] = None
+        self.free.append(slot)
+
+    def step(self):
+        """Advance every sprite by one tick. Free slots have no velocity so
+        they can be included rather than masked out."""
+        self.pos += self.vel
+        self.angle += self.spin
+
+    def sync_slot(self, slot):
+        """Move the rects of the sprite in 'slot' to its position."""
+        sprite = self.slots[slot]
+        center = int(round(self.pos[slot, 0])), int(round(self.pos[slot, 1]))
+        sprite.maprect.center = center
+        sprite.rect.center = center
+
+    def sync(self, window, cell_size):
+        """Bring rects up to date where they matter.
+
+        Syncs the sprites whose centers lie within the 'window' rect and
+        those whose centers have moved into another 'cell_size' cell since
+        they were last synced. Everywhere else a sprite's rects are off by
+        less than a cell. Returns the list of synced sprites.
+
+        """
+        pos = self.pos
+        cells = numpy.floor_divide(pos, cell_size).astype(int)
+        inside = ((pos[:, 0] >= window.left) & (pos[:, 0] < window.right) &
+                  (pos[:, 1] >= window.top) & (pos[:, 1] < window.bottom))
+        changed = (cells != self.cells).any(axis=1)
+        stale = numpy.flatnonzero((inside | changed) & self.used)
+        self.cells[stale] = cells[stale]
+        synced = []
+        for slot in stale.tolist():
+            self.sync_slot(slot)
+            synced.append(self.slots[slot])
+        return synced
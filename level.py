@@ -3,77 +3,135 @@
 # Copyright (c) Gordon McNutt, 2011
 #
 
+import budget
+import kinematics
+import perf
+import present
 import pygame
+import scheduler
+import sectors
 import vector
+import spatial
 import sprite as spaceobj
 
 white = 255, 255, 255
 GRID_COLOR = 128, 128, 128
 GRID_SIZE = 500
 CULL_FACTOR = 10
-
-
-def _check_collision(sprite, sprites):
+# Dormant sprites wake this far inside the cullrect, so they don't go
+# straight back to sleep.
+WAKE_MARGIN = 256
+# Update rates by distance from the view, nearest first: (how far beyond the
+# viewrect the band reaches, ticks between updates). The last band takes
+# everything else. Ticks fire shots that expire before flying 600 pixels,
+# so those fired beyond the first band would never be seen.
+LOD_BANDS = ((600, 1), (2000, 4), (None, 16))
+MAX_SUBSTEPS = 5  # most ticks run to catch up in one frame
+# Scheduled jobs stop for the frame once it has taken this fraction of a
+# tick, leaving the rest for presenting it.
+JOB_DEADLINE = 0.75
+CULL_SLICE = 256  # sprites checked per slice of a cull sweep
+
+
+def _check_collision(sprite, sprites, spatial, counts):
     """Check for collision between a sprite and a group of sprites.
 
-    Returns first sprite found or None. Uses the collision masks.
+    Returns first sprite found or None. Only members of 'sprites' that
+    'spatial' finds near the sprite are tested. Uses the collision masks.
+    Adds the number of rect and mask tests to 'counts'.
 
     """
-    for other in sprites:
-        if sprite.rect.colliderect(other.rect):
-            if pygame.sprite.collide_mask(sprite, other):
-                return other
-    return None
-
-
-def _check_group_collision(group1, group2):
+    rect_tests = mask_tests = 0
+    found = None
+    for other in spatial.near(sprite.maprect):
+        if other in sprites:
+            rect_tests += 1
+            if sprite.rect.colliderect(other.rect):
+                mask_tests += 1
+                if pygame.sprite.collide_mask(sprite, other):
+                    found = other
+                    break
+    counts['rect_tests'] += rect_tests
+    counts['mask_tests'] += mask_tests
+    return found
+
+
+def _check_group_collision(group1, group2, spatial, counts):
     """Check for collision between two groups of sprites.
 
-    Returns a list of tuples (sprite1, sprite2) or None. Uses
-    collision masks.
+    Returns a list of tuples (sprite1, sprite2) or None. Each sprite in
+    'group2' is only tested against the members of 'group1' that 'spatial'
+    finds near it. Uses collision masks. Adds the number of rect and mask
+    tests to 'counts'.
 
     """
+    rect_tests = mask_tests = 0
     hits = []
-    for spr1 in group1:
-        for spr2 in group2.sprites():
-            if spr1.rect.colliderect(spr2.rect):
-                if pygame.sprite.collide_mask(spr1, spr2):
-                    hits.append((spr1, spr2))
+    for spr2 in group2.sprites():
+        for spr1 in spatial.near(spr2.maprect):
+            if spr1 in group1:
+                rect_tests += 1
+                if spr1.rect.colliderect(spr2.rect):
+                    mask_tests += 1
+                    if pygame.sprite.collide_mask(spr1, spr2):
+                        hits.append((spr1, spr2))
+    counts['rect_tests'] += rect_tests
+    counts['mask_tests'] += mask_tests
     return hits
 
 
-def _check_dock(sprite, sprites):
+def _check_dock(sprite, sprites, spatial, counts):
     """Check for collision between a sprite and a group of sprites.
 
-    Returns first sprite found or None. Does NOT check the collision
-    mask, just the bounding rectangles. XXX: why not?
+    Returns first sprite found or None. Only members of 'sprites' that
+    'spatial' finds near the sprite are tested. Does NOT check the collision
+    mask, just the bounding rectangles. XXX: why not? Adds the number of
+    rect tests to 'counts'.
 
     """
-    for other in sprites:
-        if sprite.rect.colliderect(other.dock_rect):
-            return other
-    return None
+    rect_tests = 0
+    found = None
+    for other in spatial.near(sprite.maprect):
+        if other in sprites:
+            rect_tests += 1
+            if sprite.rect.colliderect(other.dock_rect):
+                found = other
+                break
+    counts['rect_tests'] += rect_tests
+    return found
 
 
 class Level(object):
     """ The level holds all the sprites and every frame updates them and
     repaints the screen. """
     def __init__(self, screen=None, fps=60, bgd=None, show_boxes=False,
-                 show_grid=False):
+                 show_grid=False, cell_size=spatial.DEFAULT_CELL_SIZE,
+                 size=None, render=True):
         """
-        screen: screen surface
-        fps: desired frames per second
+        screen: screen surface, or None to run headless
+        fps: simulation ticks per second
         bgd: background object
         show_boxes: True to show bounding boxes
+        cell_size: size of the spatial hash cells used for collisions
+        size: size of the view when there is no screen
+        render: False to skip all drawing (implied when there is no screen)
         """
         super(Level, self).__init__()
-        self.rect = screen.get_rect()
+        if screen:
+            self.rect = screen.get_rect()
+        else:
+            self.rect = pygame.Rect((0, 0), size)
+        self.render = render and screen is not None
         self.dock = None
         self.screen = screen
         self.fps = fps
+        self.ticks = 0
+        self.lag = 0.0
+        self.substeps = 0
         self.bgd = bgd
         self.all = pygame.sprite.LayeredDirty()
         self.drawn_rects = []
+        self.timer = perf.PhaseTimer()
         self.player_shots = pygame.sprite.Group()
         self.explosions = pygame.sprite.Group()
         self.hits_player = pygame.sprite.Group()
@@ -81,6 +139,42 @@ class Level(object):
         self.docks_with_player = pygame.sprite.Group()
         self.pickups = pygame.sprite.Group()
         self.hot_group = pygame.sprite.LayeredDirty()
+        self.hot_hits_player = pygame.sprite.Group()
+        self.hot_hits_player_shot = pygame.sprite.Group()
+        self.hot_docks_with_player = pygame.sprite.Group()
+        self.hot_pickups = pygame.sprite.Group()
+        self.hot_roles = (
+            (spaceobj.CollidesWithPlayer, self.hot_hits_player),
+            (spaceobj.CollidesWithPlayerShot, self.hot_hits_player_shot),
+            (spaceobj.DocksWithPlayer, self.hot_docks_with_player),
+            (spaceobj.Pickup, self.hot_pickups))
+        self.hot_view = None
+        # Camera and hot sprite positions before the last tick, for drawing
+        # between ticks.
+        self.prev_view = (0, 0)
+        self.prev_centers = {}
+        self.spatial = spatial.SpatialHash(cell_size)
+        self.kinematics = kinematics.KinematicsStore()
+        self.dormant = sectors.SectorStore()
+        self.wake_rect = None
+        # Caps on the number of sprites; unlimited until configured.
+        self.budget = budget.EntityBudget()
+        # Sprites in the collisions being handled, which must not be
+        # evicted by what they spawn.
+        self.colliding = set()
+        # Work that can wait for a frame with time to spare.
+        self.scheduler = scheduler.Scheduler()
+        self.scheduler.add('deferred', self.add_deferred, priority=2)
+        self.scheduler.add('wake', self.wake, priority=2)
+        self.scheduler.add('cull', self.cull, priority=1,
+                           period=max(fps // 4, 1))
+        self.actors = pygame.sprite.Group()
+        # Per band, one group of sprites to update on each tick of its
+        # period.
+        self.lod_buckets = [[pygame.sprite.Group() for i in range(period)]
+                            for margin, period in LOD_BANDS]
+        self.lod_rects = []
+        self.lod_next = 0  # spreads sprites over the buckets
         self.player = None
         self.show_boxes = show_boxes
         self.show_grid = show_grid
@@ -91,6 +185,7 @@ class Level(object):
                                             self.rect.height)
         self.cullrect = self.rect.inflate(self.rect.width * CULL_FACTOR,
                                           self.rect.height * CULL_FACTOR)
+        self.scroll((0, 0))
 
     def __nonzero__(self):
         """Return true iff the level is still 'active'.
@@ -114,7 +209,17 @@ class Level(object):
         This classifies the sprite based on its class type (for
         collision checking) and assigns its map location.
 
+        If the entity budget has no room for the sprite it is deferred,
+        dropped or makes room by evicting another, as its class's
+        'over_budget' says; when it isn't added None is returned instead of
+        the sprite.
+
         """
+        if self.budget.refuses(sprite) and not self._make_room(sprite,
+                                                                maploc):
+            return None
+        self.budget.admit(sprite)
+        sprite.set_fps(self.fps)
         sprite.put_at(self, maploc)
         if isinstance(sprite, spaceobj.Explosion):
             self.explosions.add(sprite)
@@ -130,9 +235,26 @@ class Level(object):
             self.docks_with_player.add(sprite)
         if isinstance(sprite, spaceobj.Pickup):
             self.pickups.add(sprite)
+        if isinstance(sprite, spaceobj.Kinematic):
+            self.kinematics.add(sprite)
+        else:
+            self.actors.add(sprite)
         self.all.add(sprite)
+        self.spatial.add(sprite)
+        sprite.lod_tick = self.ticks
+        self._file(sprite, self._lod_band(sprite))
+        if self.viewrect.colliderect(sprite.maprect):
+            self._show(sprite)
         return sprite
 
+    def to_screen(self, pos):
+        """Convert a map position to a screen position."""
+        return vector.subtract(pos, self.viewrect.topleft)
+
+    def to_map(self, pos):
+        """Convert a screen position to a map position."""
+        return vector.add(pos, self.viewrect.topleft)
+
     def view(self, sprite):
         """Center the viewrect on the sprite."""
         offset = vector.subtract(sprite.rect.center, self.viewrect.center)
@@ -144,8 +266,10 @@ class Level(object):
         Call once before calling update() or scroll().
 
         """
-        self.bgd.blit(self.screen, self.rect)
-        pygame.display.flip()
+        if self.render:
+            self.bgd.view(self.viewrect.topleft)
+            self.bgd.blit(self.screen, self.rect)
+            pygame.display.flip()
 
     def paint_grid(self):
         """Paint a grid on the background.
@@ -167,116 +291,397 @@ class Level(object):
         return dirty
 
     def cull(self):
-        """Kill sprites outside the culling rectangle."""
-        for sprite in self.all:
-            if not self.cullrect.contains(sprite.maprect) and \
-                    not isinstance(sprite, spaceobj.DocksWithPlayer):
-                sprite.kill()
+        """Kill sprites outside the culling rectangle. Persistent ones are
+        kept as dormant records to be woken when the player comes back.
+
+        A generator, so the scheduler can run the sweep CULL_SLICE sprites
+        at a time.
+
+        """
+        sprites = self.all.sprites()
+        live = self.all.spritedict
+        for start in range(0, len(sprites), CULL_SLICE):
+            cullrect = self.cullrect
+            for sprite in sprites[start:start + CULL_SLICE]:
+                if sprite in live and \
+                        not cullrect.contains(sprite.maprect) and \
+                        not isinstance(sprite, spaceobj.DocksWithPlayer):
+                    sprite.kill()
+                    if sprite.persistent:
+                        self.dormant.store(sprite)
+            yield
+
+    def _make_room(self, sprite, maploc):
+        """Deal with 'sprite' being over budget. Returns true if it can be
+        added after all."""
+        policy = sprite.over_budget
+        if policy == budget.EVICT:
+            victim = self.budget.victim(sprite, self.viewrect.center,
+                                        self.colliding)
+            if victim:
+                self.budget.record(budget.EVICT, victim)
+                victim.kill()
+                if victim.persistent:
+                    self.dormant.store(victim)
+                return True
+            policy = budget.DROP
+        self.budget.record(policy, sprite)
+        if policy == budget.DEFER:
+            self.budget.defer(sprite, maploc)
+        elif isinstance(sprite, spaceobj.Pooled):
+            sprite.pool.release(sprite)
+        return False
+
+    def add_deferred(self):
+        """Add the deferred sprites there is now room for."""
+        waiting = self.budget.waiting
+        for i in range(len(waiting)):
+            sprite, maploc = waiting.popleft()
+            if self.budget.refuses(sprite):
+                waiting.append((sprite, maploc))
+            else:
+                self.add(sprite, maploc)
+
+    def wake(self):
+        """Bring back the dormant sprites that are well inside the culling
+        rectangle. Sprites are only put to sleep outside it, so nothing
+        needs waking until it moves. Those the budget has no room for are
+        left asleep."""
+        rect = self.cullrect.inflate(-2 * WAKE_MARGIN, -2 * WAKE_MARGIN)
+        if not self.dormant or rect == self.wake_rect:
+            return
+        self.wake_rect = rect
+        for sprite, position in self.dormant.wake(
+                rect, self.budget.refuses_class):
+            if self.budget.refuses(sprite):
+                # Room ran out while adding the others: back to sleep.
+                sprite.put_at(self, position)
+                self.dormant.store(sprite)
+            else:
+                self.add(sprite, position)
+
+    def _lod_band(self, sprite):
+        """Return the index of the LOD band 'sprite' is in."""
+        if sprite.full_rate:
+            return 0
+        maprect = sprite.maprect
+        band = 0
+        for rect in self.lod_rects:
+            if rect.colliderect(maprect):
+                break
+            band += 1
+        return band
+
+    def _file(self, sprite, band):
+        """Put 'sprite' in the next bucket of LOD band 'band'."""
+        buckets = self.lod_buckets[band]
+        self.lod_next += 1
+        buckets[self.lod_next % len(buckets)].add(sprite)
+        sprite.lod = band
+
+    def update_sprites(self):
+        """Update the sprites that are due this tick.
+
+        Sprites are updated every tick near the view and every few ticks
+        further away, as set by LOD_BANDS, so the cost depends mostly on
+        what is near the player. Each band's sprites are spread over as many
+        buckets as its period and one bucket is updated per tick. A sprite
+        is passed the ticks since its last update, moved to another band if
+        it has crossed into one, and reindexed in the spatial hash unless
+        the kinematics store moves it.
+
+        """
+        ticks = self.ticks
+        due = []
+        for buckets in self.lod_buckets:
+            due += buckets[ticks % len(buckets)].sprites()
+        # Membership of the groups' dicts is much quicker to test than
+        # alive() or the groups themselves.
+        live = self.all.spritedict
+        actors = self.actors.spritedict
+        reindex = self.spatial.reindex
+        lod_band = self._lod_band
+        for sprite in due:
+            if sprite not in live:
+                continue  # killed by one updated before it
+            sprite.update(ticks - sprite.lod_tick or 1)
+            sprite.lod_tick = ticks
+            if sprite in live:
+                if sprite in actors:
+                    reindex(sprite)
+                band = lod_band(sprite)
+                if band != sprite.lod:
+                    for bucket in self.lod_buckets[sprite.lod]:
+                        bucket.remove(sprite)
+                    self._file(sprite, band)
+
+    def _show(self, sprite):
+        """Add a sprite to the hot group and its collision roles."""
+        self.hot_group.add(sprite)
+        for role, group in self.hot_roles:
+            if isinstance(sprite, role):
+                group.add(sprite)
+
+    def _hide(self, sprite):
+        """Remove a sprite from the hot group and its collision roles."""
+        self.hot_group.remove(sprite)
+        for role, group in self.hot_roles:
+            group.remove(sprite)
 
     def update_hot_group(self):
-        """Rebuild the list of visible sprites."""
-        self.hot_group.empty()
-        for sprite in self.all:
-            if self.viewrect.colliderect(sprite.maprect):
-                self.hot_group.add(sprite)
-                sprite.pre_render()
+        """Bring the set of visible sprites up to date.
 
-    def update(self):
-        """Animate, run AI and handle collisions.
+        Sprites join and leave the hot group as they cross the edge of the
+        viewrect. Normally only the sprites the spatial hash has along that
+        edge are checked; if the view has jumped by half a cell or more then
+        everything near it is checked instead. Killed sprites drop out of
+        the hot groups on their own.
 
-        Should be called every frame. Erases the dirty rects from the
-        last update and makes some more. Handles scrolling, updating
-        all the sprites, repainting them, and checking for collisions.
+        """
+        view = self.viewrect
+        half_cell = self.spatial.cell_size / 2
+        if self.hot_view is None or \
+                abs(view.left - self.hot_view[0]) >= half_cell or \
+                abs(view.top - self.hot_view[1]) >= half_cell:
+            candidates = self.spatial.near(view)
+            candidates.update(self.hot_group)
+        else:
+            candidates = self.spatial.border(view)
+        self.hot_view = view.topleft
+        hot_group = self.hot_group
+        for sprite in candidates:
+            if view.colliderect(sprite.maprect):
+                if sprite not in hot_group:
+                    self._show(sprite)
+            elif sprite in hot_group:
+                self._hide(sprite)
+        for sprite in hot_group:
+            sprite.pre_render()
+
+    def camera(self, alpha=1.0):
+        """Return the map position of the top left of the screen, 'alpha'
+        of the way from where it was before the last tick to where it is
+        now."""
+        back = 1.0 - alpha
+        view = self.viewrect
+        return (view.left - (view.left - self.prev_view[0]) * back,
+                view.top - (view.top - self.prev_view[1]) * back)
+
+    def draw_sprites(self, sprites, alpha=1.0):
+        """Blit the sprites at their screen positions, 'alpha' of the way
+        from where they and the camera were before the last tick to where
+        they are now.
+
+        Returns the list of dirty rectangles.
+
+        """
+        back = 1.0 - alpha
+        left, top = self.camera(alpha)
+        prev_centers = self.prev_centers
+        blits = []
+        for sprite in sprites:
+            rect = sprite.rect
+            x, y = rect.left - left, rect.top - top
+            prev = prev_centers.get(sprite)
+            if prev is not None:
+                x -= (rect.centerx - prev[0]) * back
+                y -= (rect.centery - prev[1]) * back
+            blits.append((sprite.image, (int(round(x)), int(round(y)))))
+        # One call for the lot, which matters when many small frames from
+        # the same atlas are on screen.
+        return self.screen.blits(blits)
+
+    def draw(self, alpha=1.0):
+        """Paint the grid, the hot group and the overlays, with the hot
+        group interpolated by 'alpha' (see draw_sprites()).
+
+        Adds to the list of drawn rects.
 
         """
-        # Erase the rects drawn last time we were in update by blitting the
-        # background over them.
-        for drect in self.drawn_rects:
-            self.bgd.blit(self.screen, drect)
-        erased_rects = self.drawn_rects
-        # Handle auto-scrolling. If the player moves out of the scrolling rect
-        # then scroll in that direction.
-        if self.player.rect.top < self.scrollrect.top:
-            self.scroll((0, (self.player.rect.top - self.scrollrect.top)))
-        elif self.player.rect.bottom > self.scrollrect.bottom:
-            self.scroll((0, (self.player.rect.bottom -
-                             self.scrollrect.bottom)))
-        if self.player.rect.left < self.scrollrect.left:
-            self.scroll(((self.player.rect.left - self.scrollrect.left), 0))
-        elif self.player.rect.right > self.scrollrect.right:
-            self.scroll(((self.player.rect.right - self.scrollrect.right), 0))
-        # Cull out-of-bound sprites.
-        self.cull()
-        # Update (move) all sprites.
-        self.all.update()
-        # Reset the drawn rects to empty before we start painting sprites.
-        self.drawn_rects = []
         # Paint the grid.
         if self.show_grid:
             self.drawn_rects += self.paint_grid()
-        # Gather sprites into the hot group and render it.
-        self.update_hot_group()
-        self.drawn_rects += self.hot_group.draw(self.screen)
+        self.drawn_rects += self.draw_sprites(self.hot_group, alpha)
         # Show bounding boxes if called for.
         if self.show_boxes:
+            offset = vector.scalar_multiply(self.viewrect.topleft, -1)
             for sprite in self.all:
-                pygame.draw.rect(self.screen, white, sprite.rect, 1)
+                pygame.draw.rect(self.screen, white, sprite.rect.move(offset),
+                                 1)
             pygame.draw.rect(self.screen, white, self.scrollrect, 1)
         # Draw player velocity vector line.
         if self.player.alive():
             self.drawn_rects.append(self.player.draw_velocity())
-        # # draw angles
-        # for sprite in self.all:
-        #     if hasattr(sprite, 'draw_angle'):
-        #         self.drawn_rects.append(sprite.draw_angle())
-        dirty_rects = erased_rects + self.drawn_rects
-        #pygame.display.update(dirty_rects)
+
+    def step(self):
+        """Advance the simulation by one tick.
+
+        Handles scrolling, updating the sprites, gathering the hot group and
+        checking for collisions. Culling is left to the scheduler. Remembers
+        where the camera and the hot sprites were beforehand so frames can
+        be drawn between this tick and the last.
+
+        """
+        timer = self.timer
+        self.prev_view = self.viewrect.topleft
+        self.prev_centers = dict((sprite, sprite.rect.center)
+                                 for sprite in self.hot_group)
+        # Handle auto-scrolling. If the player moves out of the scrolling rect
+        # then scroll in that direction.
+        player_rect = self.player.rect
+        scrollrect = self.scrollrect.move(self.viewrect.topleft)
+        if player_rect.top < scrollrect.top:
+            self.scroll((0, (player_rect.top - scrollrect.top)))
+        elif player_rect.bottom > scrollrect.bottom:
+            self.scroll((0, (player_rect.bottom - scrollrect.bottom)))
+        if player_rect.left < scrollrect.left:
+            self.scroll(((player_rect.left - scrollrect.left), 0))
+        elif player_rect.right > scrollrect.right:
+            self.scroll(((player_rect.right - scrollrect.right), 0))
+        timer.mark('scroll')
+        # Update (move) the sprites and keep the spatial hash in step. The
+        # kinematics store moves the drifting sprites all at once and syncs
+        # the rects of those near the view or changing cells; the rest are
+        # updated at rates that fall off with distance from the view.
+        self.kinematics.step()
+        cell_size = self.spatial.cell_size
+        window = self.viewrect.inflate(4 * cell_size, 4 * cell_size)
+        for sprite in self.kinematics.sync(window, cell_size):
+            self.spatial.reindex(sprite)
+        self.update_sprites()
+        timer.mark('update')
+        # Gather sprites into the hot group. Collisions are only checked
+        # among the hot sprites, so this is done every tick.
+        self.update_hot_group()
+        timer.mark('hot')
 
         # Collision checking.
-        if self.hits_player:
+        if self.hot_hits_player:
             if self.player.alive():
-                group = [sprite for sprite in self.hot_group if
-                         isinstance(sprite, spaceobj.CollidesWithPlayer)]
-                other = _check_collision(self.player, group)
+                other = _check_collision(self.player, self.hot_hits_player,
+                                         self.spatial, timer.counts)
                 if other:
+                    self.colliding = set((other, self.player))
                     other.destroy()
                     self.player.destroy()
-        if self.hits_player_shot:
-            group = [sprite for sprite in self.hot_group if
-                     isinstance(sprite, spaceobj.CollidesWithPlayerShot)]
-            hits = _check_group_collision(group, self.player_shots)
+        if self.hot_hits_player_shot:
+            hits = _check_group_collision(self.hot_hits_player_shot,
+                                          self.player_shots, self.spatial,
+                                          timer.counts)
+            self.colliding = set(sprite for hit in hits for sprite in hit)
             for hit in hits:
                 hit[0].hit()
                 hit[1].destroy()
-        if self.docks_with_player:
+        if self.hot_docks_with_player:
             if self.player.alive():
-                group = [sprite for sprite in self.hot_group if
-                         isinstance(sprite, spaceobj.DocksWithPlayer)
-                         and sprite.ready_to_dock]
-                other = _check_dock(self.player, group)
+                group = set(sprite for sprite in self.hot_docks_with_player
+                            if sprite.ready_to_dock)
+                other = _check_dock(self.player, group, self.spatial,
+                                    timer.counts)
                 if other:
                     self.dock = other
-        if self.pickups:
+        if self.hot_pickups:
             if self.player.alive():
-                group = [sprite for sprite in self.hot_group if
-                         isinstance(sprite, spaceobj.Pickup)]
-                other = _check_collision(self.player, group)
+                other = _check_collision(self.player, self.hot_pickups,
+                                         self.spatial, timer.counts)
                 if other:
                     self.player.get(other)
                     other.kill()
-        return dirty_rects
+        self.colliding = set()
+        timer.mark('collide')
+        self.ticks += 1
+
+    def draw_frame(self, alpha=1.0):
+        """Erase the dirty rects from the last frame and repaint.
+
+        Sprites are drawn 'alpha' of the way from where they were before
+        the last tick to where they are now. Returns the list of dirty
+        rects, which is empty when not rendering, and is the whole screen
+        when the background has moved.
+
+        """
+        if not self.render:
+            return []
+        timer = self.timer
+        # Erase the rects drawn last time by blitting the background over
+        # them. Overlapping and neighbouring rects are merged first so each
+        # pixel is filled once, with fewer, larger fills. If the background
+        # has scrolled with the camera the whole screen is repainted.
+        left, top = self.camera(alpha)
+        if self.bgd.view((int(round(left)), int(round(top)))):
+            erased_rects = [self.rect]
+        else:
+            erased_rects = present.coalesce(self.drawn_rects)
+        for drect in erased_rects:
+            self.bgd.blit(self.screen, drect)
+        timer.mark('erase')
+        # Reset the drawn rects to empty before we start painting sprites.
+        self.drawn_rects = []
+        self.draw(alpha)
+        # # draw angles
+        # for sprite in self.all:
+        #     if hasattr(sprite, 'draw_angle'):
+        #         self.drawn_rects.append(sprite.draw_angle())
+        timer.mark('draw')
+        return erased_rects + self.drawn_rects
+
+    def update(self, elapsed=None):
+        """Run the simulation for 'elapsed' seconds and draw a frame.
+
+        Should be called every frame. The simulation runs at a fixed 'fps'
+        ticks per second no matter how fast frames are drawn: 'elapsed' is
+        added to the time owed and as many whole ticks are run as that
+        covers, up to MAX_SUBSTEPS. Anything owed beyond those is dropped so
+        that a slow machine slows the game down rather than falling ever
+        further behind. The frame is drawn partway between the last two
+        ticks by the fraction of a tick still owed.
+
+        With no 'elapsed' exactly one tick is run and drawn, for stepping
+        through the game or running it headless.
+
+        Scheduled jobs, such as culling, then run until the frame has taken
+        JOB_DEADLINE of a tick. With no 'elapsed' every due job is run to
+        the end instead, so that headless runs and benchmarks don't depend
+        on how busy the machine is. Returns the dirty rects. The time spent in
+        each phase is left in self.timer.
+
+        """
+        self.timer.start()
+        start = self.scheduler.clock()
+        tick = 1.0 / self.fps
+        if elapsed is None:
+            self.substeps = 1
+            self.step()
+            dirty = self.draw_frame()
+        else:
+            self.lag += elapsed
+            self.substeps = 0
+            while self.lag >= tick and self.substeps < MAX_SUBSTEPS:
+                self.step()
+                self.lag -= tick
+                self.substeps += 1
+            self.lag %= tick
+            dirty = self.draw_frame(self.lag / tick)
+        if elapsed is None:
+            self.scheduler.run(self.ticks)
+        else:
+            self.scheduler.run(self.ticks, start + JOB_DEADLINE * tick)
+        self.timer.mark('jobs')
+        self.timer.split('jobs', 'cull', self.scheduler.times.get('cull', 0.0))
+        return dirty
 
     def scroll(self, offset):
-        """Scroll the view."""
-        # Clamp the view to the maprect. Subtle: the sprites are offset in the
-        # opposite direction.
-        clamped_rect = self.viewrect.move(offset)
-        clamped_offset = vector.subtract(self.viewrect.topleft,
-                                         clamped_rect.topleft)
-        self.viewrect = clamped_rect
+        """Scroll the view.
+
+        Sprites keep their map positions and are offset by the viewrect when
+        drawn, so this only moves the view, the culling rectangle and the
+        LOD bands.
+
+        """
+        self.viewrect.move_ip(offset)
         self.cullrect.center = self.viewrect.center
-        for sprite in self.all:
-            sprite.scroll(clamped_offset)
+        self.lod_rects = [self.viewrect.inflate(2 * margin, 2 * margin)
+                          for margin, period in LOD_BANDS[:-1]]
 
     def get_offscreen_position(self, size):
         """Get a randomly located offscreen rectangle.
@@ -1,11 +1,28 @@
+import numpy
 import pygame
 import ui
 import vector
 
+# Objects in one minimap pixel at which it shows their density instead.
+DENSE = 3
+
+
+def _heat_ramp(levels):
+    """ Return 'levels' colours running from dark red through yellow to
+    white, one per doubling of density. """
+    ramp = numpy.zeros((levels, 3), dtype=numpy.uint8)
+    for i in range(levels):
+        heat = 3.0 * (i + 1) / levels
+        ramp[i] = [int(255 * min(max(heat - part, 0.0), 1.0))
+                   for part in (0, 1, 2)]
+    return ramp
+
 
 class LevelMap(ui.Widget):
     """ Mini-map of a level. Covers the cullrect. Shows sprites which have the
-    'color' attribute. """
+    'color' attribute, and the density of them where they crowd together. """
+
+    HEAT = _heat_ramp(12)
 
     def __init__(self, level, scale, pos, **kwargs):
         """ 'level' provides the sprites. 'scale' is the scale factor. 'pos' is
@@ -15,27 +32,54 @@ class LevelMap(ui.Widget):
         self.scale = scale
         self.rect.topleft = pos
         self.rect.size = vector.scalar_divide(level.cullrect.size, scale)
+        self.image = pygame.Surface(self.rect.size)
+
+    def plot(self):
+        """ Return an array of the colours of the minimap pixels, indexed
+        by x then y.
+
+        The drifting sprites are plotted all at once from the level's
+        kinematics store: each pixel takes the colour of a sprite in it, or
+        a colour from HEAT if it holds DENSE sprites or more. The few
+        other sprites are then plotted over them one by one. """
+        width, height = self.rect.size
+        cullrect = self.level.cullrect
+        store = self.level.kinematics
+        shown = numpy.flatnonzero(store.used & store.colored)
+        pos = numpy.floor_divide(store.pos[shown] - cullrect.topleft,
+                                 self.scale).astype(int)
+        inside = ((pos[:, 0] >= 0) & (pos[:, 0] < width) &
+                  (pos[:, 1] >= 0) & (pos[:, 1] < height))
+        pixels = pos[inside, 0] * height + pos[inside, 1]
+        image = numpy.empty((width * height, 3), dtype=numpy.uint8)
+        image[:] = self.bgcolor[:3]
+        image[pixels] = store.colors[shown[inside]]
+        counts = numpy.bincount(pixels, minlength=width * height)
+        dense = numpy.flatnonzero(counts >= DENSE)
+        if len(dense):
+            heat = numpy.log2(counts[dense] / float(DENSE)).astype(int)
+            image[dense] = self.HEAT[numpy.minimum(heat, len(self.HEAT) - 1)]
+        image = image.reshape(width, height, 3)
+        for sprite in self.level.actors:
+            color = getattr(sprite, 'color', None)
+            if color:
+                x = (sprite.maprect.centerx - cullrect.left) // self.scale
+                y = (sprite.maprect.centery - cullrect.top) // self.scale
+                if 0 <= x < width and 0 <= y < height:
+                    image[x, y] = color
+        return image
+
+    def replot(self):
+        """ Plot the sprites on the cached map image. """
+        pygame.surfarray.blit_array(self.image, self.plot())
+        self.invalidate()
 
     def paint(self):
-        """ Loop over all sprites on the level and paint dots for the ones that
-        have a 'color' attribute. Use their distance from the topleft corner of
-        the cullrect and the scale factor to calculate their positions on the
-        minimap. """
-        self.surf.fill(self.bgcolor, self.rect)
-        ori_left = self.level.cullrect.left
-        ori_top = self.level.cullrect.top
-        rect = pygame.Rect(0, 0, 0, 0)
-        for sprite in self.level.all:
-            if hasattr(sprite, 'color'):
-                off_left = (sprite.maprect.centerx - ori_left) / self.scale
-                off_top = (sprite.maprect.centery - ori_top) / self.scale
-                rect.left = self.rect.left + off_left
-                rect.top = self.rect.top + off_top
-                # Note: this next part make big asteroids blink as they rotate
-                # (size oscillates between 0 and 1; change in brightness looks
-                # like a blink)
-                #rect.width = sprite.rect.width / self.scale
-                #rect.height = sprite.rect.height / self.scale
-                pygame.draw.rect(self.level.screen, sprite.color, rect)
-        return pygame.draw.rect(self.level.screen, (255, 255, 255), self.rect, 
-                                1)
+        """ Blit the cached map image. """
+        self.surf.blit(self.image, self.rect)
+        self.dirty = False
+        return pygame.draw.rect(self.surf, (255, 255, 255), self.rect, 1)
+
+    def tick(self):
+        self.replot()
+        return self.refresh()
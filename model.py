@@ -2,12 +2,91 @@
 
 import animation
 import json
+import multiprocessing
 import os
+import pygame
+import threading
+import timeit
 
-def load(dirname, fps):
-    """Load a model from a standard directory layout."""
-    descr = json.loads(open(os.path.join(dirname, 'model.json')).read())
+def _read_descr(dirname):
+    return json.loads(open(os.path.join(dirname, 'model.json')).read())
+
+def load(dirname, fps, atlas=None):
+    """Load a model from a standard directory layout. If an 'atlas' is given
+    the frames are packed into it."""
+    descr = _read_descr(dirname)
     model = {}
     for key, value in descr['animations'].items():
-        model[key] = animation.load(dirname, fps, value)
+        model[key] = animation.load(dirname, fps, value, atlas)
     return model
+
+def _decode(path):
+    """Decode the image at 'path', returning (image, seconds taken)."""
+    start = timeit.default_timer()
+    image = pygame.image.load(path)
+    return image, timeit.default_timer() - start
+
+def _decode_all(paths, threads):
+    """Decode the images at 'paths' on 'threads' threads. Returns a
+    dictionary of (image, seconds taken) by path. If decoding an image
+    fails the error is raised here, once every thread has stopped."""
+    todo = list(paths)
+    decoded = {}
+    errors = []
+
+    def work():
+        while not errors:
+            try:
+                path = todo.pop()
+            except IndexError:
+                return
+            try:
+                decoded[path] = _decode(path)
+            except Exception as e:
+                errors.append(e)
+    workers = [threading.Thread(target=work) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    if errors:
+        raise errors[0]
+    return decoded
+
+
+def load_all(dirnames, fps, atlas=None, threads=None):
+    """Load a model from each directory in 'dirnames'.
+
+    The images of all the models are decoded concurrently on a pool of
+    'threads' threads (default: one per core), then converted to display
+    format, and packed into 'atlas' if one is given, on the calling thread.
+    Returns (models, seconds), where seconds[i] is the time spent decoding
+    and converting the images of models[i].
+
+    """
+    descrs = [_read_descr(dirname) for dirname in dirnames]
+    paths = sorted(set(os.path.join(dirname, frame)
+                       for dirname, descr in zip(dirnames, descrs)
+                       for value in descr['animations'].values()
+                       for frame in value['frames']))
+    decoded = _decode_all(paths, threads or multiprocessing.cpu_count())
+    models = []
+    seconds = []
+    images = {}
+    for dirname, descr in zip(dirnames, descrs):
+        model = {}
+        elapsed = 0.0
+        for key, value in descr['animations'].items():
+            frames = []
+            for frame in value['frames']:
+                path = os.path.join(dirname, frame)
+                if path not in images:
+                    image, decode_time = decoded[path]
+                    start = timeit.default_timer()
+                    images[path] = animation.prepare_image(image, atlas)
+                    elapsed += decode_time + timeit.default_timer() - start
+                frames.append(images[path])
+            model[key] = animation.build(fps, value, frames)
+        models.append(model)
+        seconds.append(elapsed)
+    return models, seconds
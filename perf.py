@@ -0,0 +1,72 @@
+"""Frame timing helpers."""
+#
+# Copyright (c) Gordon McNutt, 2013
+#
+
+import math
+import timeit
+
+# The phases of Level.update, in order. The ones up to 'collide' are run
+# once per tick, and there may be several ticks in a frame. 'jobs' is the
+# scheduled work run in the time left, apart from culling, which is kept
+# separately as 'cull'.
+PHASES = ('scroll', 'update', 'hot', 'collide', 'erase', 'draw', 'jobs',
+          'cull')
+
+# The per-frame counters kept alongside the phase times.
+COUNTERS = ('rect_tests', 'mask_tests')
+
+
+class PhaseTimer(object):
+    """Times the phases of one frame. Call start() at the beginning of the
+    frame and mark() at the end of each phase; 'phases' then maps each phase
+    name to the seconds it took in the last frame, summed over the times it
+    was run. 'counts' holds counters. Both are reset by start()."""
+
+    def __init__(self):
+        self.phases = dict((phase, 0.0) for phase in PHASES)
+        self.counts = dict((counter, 0) for counter in COUNTERS)
+        self.last = 0.0
+
+    def start(self):
+        for phase in self.phases:
+            self.phases[phase] = 0.0
+        for counter in self.counts:
+            self.counts[counter] = 0
+        self.last = timeit.default_timer()
+
+    def mark(self, phase):
+        """End 'phase' and start timing the next one."""
+        now = timeit.default_timer()
+        self.phases[phase] += now - self.last
+        self.last = now
+
+    def split(self, phase, part, seconds):
+        """Move 'seconds' of the time marked for 'phase' to 'part'."""
+        self.phases[phase] -= seconds
+        self.phases[part] += seconds
+
+    def total(self):
+        """Return the seconds taken by all the phases of the last frame."""
+        return sum(self.phases.values())
+
+
+def percentile(values, pct):
+    """Return the 'pct' percentile (0-100) of 'values' by the nearest-rank
+    method.
+
+    >>> percentile([4, 1, 3, 2], 50)
+    2
+    >>> percentile([4, 1, 3, 2], 100)
+    4
+    >>> percentile([7], 90)
+    7
+    """
+    ordered = sorted(values)
+    rank = int(math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[max(rank - 1, 0)]
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
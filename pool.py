@@ -0,0 +1,37 @@
+"""Pools for recycling short-lived sprites."""
+#
+# Copyright (c) Gordon McNutt, 2013
+#
+
+DEFAULT_MAX_SIZE = 256
+
+
+class Pool(object):
+    """Keeps killed sprites of one class for reuse.
+
+    get() hands out a recycled sprite, reset() with the given arguments, or
+    makes a new one when the pool is empty. 'hits' and 'misses' count which
+    happened.
+
+    """
+    def __init__(self, cls, max_size=DEFAULT_MAX_SIZE):
+        self.cls = cls
+        self.max_size = max_size
+        self.free = []
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, **kwargs):
+        if self.free:
+            self.hits += 1
+            sprite = self.free.pop()
+            sprite.reset(**kwargs)
+        else:
+            self.misses += 1
+            sprite = self.cls(**kwargs)
+        return sprite
+
+    def release(self, sprite):
+        """Take back a killed sprite, unless the pool is full."""
+        if len(self.free) < self.max_size:
+            self.free.append(sprite)
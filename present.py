@@ -0,0 +1,80 @@
+"""Getting dirty rects onto the display."""
+#
+# Copyright (c) Gordon McNutt, 2013
+#
+
+import pygame
+
+# Rects closer than this many pixels are merged into one.
+DEFAULT_GAP = 8
+
+# Flip the whole display once the dirty area is this fraction of the screen.
+DEFAULT_FLIP_RATIO = 0.4
+
+
+def coalesce(rects, gap=DEFAULT_GAP):
+    """Merge the rects that overlap or lie closer than 'gap' pixels to each
+    other into their unions, until none of the results do. Empty rects are
+    dropped. Returns a new list.
+
+    >>> coalesce([(0, 0, 10, 10), (5, 5, 10, 10), (100, 0, 10, 10)], 0)
+    [<rect(0, 0, 15, 15)>, <rect(100, 0, 10, 10)>]
+    >>> coalesce([(0, 0, 10, 10), (13, 0, 10, 10)], 4)
+    [<rect(0, 0, 23, 10)>]
+    >>> coalesce([(0, 0, 10, 10), (14, 0, 10, 10)], 4)
+    [<rect(0, 0, 10, 10)>, <rect(14, 0, 10, 10)>]
+    >>> coalesce([(0, 0, 0, 10)])
+    []
+    """
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        if not rect.width or not rect.height:
+            continue
+        while True:
+            index = rect.inflate(2 * gap, 2 * gap).collidelist(merged)
+            if index < 0:
+                break
+            rect.union_ip(merged.pop(index))
+        merged.append(rect)
+    return merged
+
+
+class Presenter(object):
+    """Updates the display from a frame's dirty rects.
+
+    The rects are coalesced and clipped to the screen. When they cover at
+    least 'flip_ratio' of it the whole display is flipped instead, which is
+    cheaper than many scattered updates. After each present() 'rects' and
+    'pixels' hold how many rects were updated and their area, and 'flipped'
+    whether the display was flipped.
+
+    """
+    def __init__(self, screen, gap=DEFAULT_GAP,
+                 flip_ratio=DEFAULT_FLIP_RATIO):
+        self.screen_rect = screen.get_rect()
+        self.gap = gap
+        self.flip_ratio = flip_ratio
+        self.rects = 0
+        self.pixels = 0
+        self.flipped = False
+
+    def present(self, rects):
+        screen_rect = self.screen_rect
+        rects = [rect.clip(screen_rect) for rect in coalesce(rects, self.gap)]
+        pixels = sum(rect.width * rect.height for rect in rects)
+        screen_pixels = screen_rect.width * screen_rect.height
+        self.flipped = pixels >= self.flip_ratio * screen_pixels
+        if self.flipped:
+            pygame.display.flip()
+            self.rects = 1
+            self.pixels = screen_pixels
+        else:
+            pygame.display.update(rects)
+            self.rects = len(rects)
+            self.pixels = pixels
+
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,107 @@
+"""Running deferrable work in the time a frame has left."""
+#
+# Copyright (c) Gordon McNutt, 2013
+#
+
+import timeit
+import types
+
+
+class Job(object):
+    """A piece of work for a Scheduler; see Scheduler.add()."""
+
+    def __init__(self, name, func, priority, period):
+        self.name = name
+        self.func = func
+        self.priority = priority
+        self.period = period
+        self.due = 0  # tick at which to start next
+        self.started = None  # tick the current run started, while running
+        self.generator = None  # the current run of a generator job
+        self.waited = 0  # frames due without being run
+
+    def step(self, tick):
+        """Run a slice of the job. Returns true once the run is finished."""
+        if self.started is None:
+            self.started = tick
+            result = self.func()
+            if not isinstance(result, types.GeneratorType):
+                return self.finish()
+            self.generator = result
+        try:
+            next(self.generator)
+        except StopIteration:
+            return self.finish()
+        return False
+
+    def finish(self):
+        self.due = self.started + self.period
+        self.started = None
+        self.generator = None
+        return True
+
+
+class Scheduler(object):
+    """Runs jobs that need not finish every frame, in the frame's spare time.
+
+    Each job is a function run every 'period' ticks. A function that returns
+    a generator is run one slice (one next()) at a time, so a long job can
+    be spread over several frames; its run ends when the generator does.
+    run() goes through the due jobs, highest priority first and then the
+    most overdue, until the deadline passes. Jobs not reached wait for the
+    next frame, and their priority goes up by one for each frame they wait
+    so that busy frames can't starve them. The first slice is run even if
+    the deadline has already passed, so some work is always done.
+
+    With no deadline every due job is run to the end, for runs that must
+    not depend on the speed of the machine.
+
+    After each run(), 'slices' is the number of slices run, 'deferred' the
+    number of jobs that were due but not finished and 'times' the seconds
+    spent in each job that ran, by name.
+
+    """
+    def __init__(self, clock=timeit.default_timer):
+        self.clock = clock
+        self.jobs = []
+        self.slices = 0
+        self.deferred = 0
+        self.times = {}
+
+    def add(self, name, func, priority=0, period=1):
+        """Schedule 'func' to be run every 'period' ticks. Returns the
+        Job."""
+        job = Job(name, func, priority, period)
+        self.jobs.append(job)
+        return job
+
+    def remove(self, name):
+        self.jobs = [job for job in self.jobs if job.name != name]
+
+    def run(self, tick, deadline=None):
+        """Run slices of the jobs due at 'tick' until the clock passes
+        'deadline', or all of them if there is none."""
+        clock = self.clock
+        due = [job for job in self.jobs
+               if job.started is not None or job.due <= tick]
+        due.sort(key=lambda job: (-job.priority - job.waited,
+                                  job.due if job.started is None
+                                  else job.started))
+        self.slices = 0
+        self.deferred = len(due)
+        self.times = times = {}
+        for job in due:
+            job.waited += 1
+        now = clock()
+        for job in due:
+            while self.slices == 0 or deadline is None or now < deadline:
+                job.waited = 0
+                self.slices += 1
+                finished = job.step(tick)
+                start, now = now, clock()
+                times[job.name] = times.get(job.name, 0.0) + now - start
+                if finished:
+                    self.deferred -= 1
+                    break
+            else:
+                return
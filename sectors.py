@@ -0,0 +1,76 @@
+"""Storage for sprites that are too far from the player to simulate."""
+#
+# Copyright (c) Gordon McNutt, 2013
+#
+
+DEFAULT_SECTOR_SIZE = 1024
+
+# Fields of a dormant sprite's record.
+CLASS, X, Y, VX, VY, ANGLE, SPIN, STATE = range(8)
+
+
+class SectorStore(object):
+    """Keeps dormant sprites as records in a grid of square sectors.
+
+    A record is a tuple of the sprite's class, map position, velocity,
+    angle, angular velocity and whatever its get_state() returns. The
+    sprite itself is dropped, so a dormant sprite costs its record and
+    nothing per tick. Time stands still for it: wake() makes a new sprite
+    of the same class where it was stored, moving as it was.
+
+    """
+    def __init__(self, sector_size=DEFAULT_SECTOR_SIZE):
+        self.sector_size = sector_size
+        self.sectors = {}  # (column, row): list of records
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def sector(self, pos):
+        """Return the key of the sector holding map position 'pos'."""
+        return (int(pos[0]) // self.sector_size,
+                int(pos[1]) // self.sector_size)
+
+    def store(self, sprite):
+        """Add a record of 'sprite', which should be dead already."""
+        x, y = sprite.maprect.center
+        vx, vy = sprite.velocity
+        record = (type(sprite), x, y, vx, vy, sprite.angle,
+                  sprite.angular_velocity, sprite.get_state())
+        self.sectors.setdefault(self.sector((x, y)), []).append(record)
+        self.count += 1
+
+    def wake(self, rect, refuses=None):
+        """Remove the records of the sprites inside 'rect' and return a new
+        sprite for each, with its map position, as a list of (sprite,
+        position) pairs. Records of the classes for which 'refuses' returns
+        true are left asleep without making a sprite."""
+        size = self.sector_size
+        woken = []
+        for column in range(rect.left // size, (rect.right - 1) // size + 1):
+            for row in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                records = self.sectors.get((column, row))
+                if not records:
+                    continue
+                kept = []
+                for record in records:
+                    if rect.collidepoint(record[X], record[Y]) and \
+                            not (refuses and refuses(record[CLASS])):
+                        woken.append(self.rebuild(record))
+                    else:
+                        kept.append(record)
+                if kept:
+                    self.sectors[(column, row)] = kept
+                else:
+                    del self.sectors[(column, row)]
+        self.count -= len(woken)
+        return woken
+
+    def rebuild(self, record):
+        """Return (sprite, position) made from 'record'."""
+        sprite = record[CLASS](velocity=[record[VX], record[VY]],
+                               angular_velocity=record[SPIN])
+        sprite.angle = record[ANGLE]
+        sprite.set_state(record[STATE])
+        return sprite, (record[X], record[Y])
@@ -0,0 +1,261 @@
+"""Run the simulation of a level in a worker process.
+
+The worker steps a headless Level at its fixed tick rate and, after every
+tick, publishes a snapshot of what is visible to shared memory. The main
+process draws the latest snapshot and passes the player's input back, so
+drawing and simulating each get a core of their own. The worker is forked,
+so it inherits the models already loaded by the main process.
+"""
+#
+# Copyright (c) Gordon McNutt, 2013
+#
+
+import controls
+import level
+import multiprocessing
+import numpy
+import present
+import pygame
+import timeit
+import time
+from multiprocessing import sharedctypes
+
+# Layout of the snapshot header.
+SEQ, ALIVE, VIEW_LEFT, VIEW_TOP, AMMO, ORE, DOCK, OBJECTS, COUNT = range(9)
+HEADER = 9
+
+# Fields of each sprite record in the snapshot, which follow the header.
+KIND, ANIMATION, FRAME, ANGLE, X, Y = range(6)
+FIELDS = 6
+
+# Most sprites a snapshot holds; any more visible sprites are not drawn.
+MAX_RECORDS = 4096
+
+# Layout of the input array.
+POINTER_X, POINTER_Y, FIRING, THRUSTING, RESUME, QUIT = range(6)
+INPUTS = 6
+
+# Values of the DOCK header field.
+UNDOCKED, DOCKED, DOCKED_AT_GOAL = range(3)
+
+
+def _frame(animation, frameno):
+    """Return frame 'frameno' of an Animation or SingleFrameAnimation."""
+    if hasattr(animation, 'frames'):
+        return animation.frames[frameno]
+    return animation.frame
+
+
+def _animations(classes):
+    """Return, for each sprite class, the animations of its model in a
+    fixed order, so both processes can refer to them by index."""
+    return [[cls.__model__[key] for key in sorted(cls.__model__)]
+            for cls in classes]
+
+
+class SharedControls(object):
+    """Reads the player's controls from the input array, as last written by
+    the main process."""
+
+    def __init__(self, inputs):
+        self.inputs = inputs
+
+    def pointer(self):
+        return self.inputs[POINTER_X], self.inputs[POINTER_Y]
+
+    def firing(self):
+        return bool(self.inputs[FIRING])
+
+    def thrusting(self):
+        return bool(self.inputs[THRUSTING])
+
+
+class Worker(object):
+    """The worker process's end: owns the Level and publishes snapshots."""
+
+    def __init__(self, snapshot, lock, inputs, classes, size, fps,
+                 build, undock):
+        self.snapshot = numpy.frombuffer(snapshot, dtype=numpy.intc)
+        self.lock = lock
+        self.inputs = inputs
+        self.undock = undock
+        self.kinds = dict((cls, i) for i, cls in enumerate(classes))
+        self.animation_index = [
+            dict((animation, i) for i, animation in enumerate(animations))
+            for animations in _animations(classes)]
+        self.level = level.Level(fps=fps, size=size)
+        self.goal = build(self.level, SharedControls(inputs))
+
+    def publish(self):
+        """Write the visible sprites and the player's state to the
+        snapshot."""
+        lvl = self.level
+        records = []
+        for sprite in lvl.hot_group:
+            kind = self.kinds[type(sprite)]
+            view = sprite.animation_view
+            records.append((kind,
+                            self.animation_index[kind][view.animation],
+                            view.frameno,
+                            sprite.quantized_angle() if sprite.angle else 0)
+                           + sprite.rect.center)
+        records = records[:MAX_RECORDS]
+        if lvl.dock is None:
+            dock = UNDOCKED
+        elif lvl.dock is self.goal:
+            dock = DOCKED_AT_GOAL
+        else:
+            dock = DOCKED
+        header = (bool(lvl), lvl.viewrect.left, lvl.viewrect.top,
+                  lvl.player.ammo, lvl.player.ore, dock, len(lvl.all),
+                  len(records))
+        with self.lock:
+            snapshot = self.snapshot
+            snapshot[SEQ] += 1
+            snapshot[ALIVE:HEADER] = header
+            if records:
+                snapshot[HEADER:HEADER + len(records) * FIELDS] = \
+                    numpy.array(records, dtype=numpy.intc).ravel()
+
+    def run(self):
+        """Step the level in real time until it ends or the main process
+        asks us to quit. Waits out each dock until the main process says to
+        resume."""
+        lvl = self.level
+        inputs = self.inputs
+        tick = 1.0 / lvl.fps
+        resumed = inputs[RESUME]
+        last = timeit.default_timer()
+        self.publish()
+        while lvl and not inputs[QUIT]:
+            now = timeit.default_timer()
+            ticks = lvl.ticks
+            lvl.update(now - last)
+            last = now
+            if lvl.ticks != ticks:
+                self.publish()
+            if lvl.dock:
+                while inputs[RESUME] == resumed and not inputs[QUIT]:
+                    time.sleep(tick)
+                resumed = inputs[RESUME]
+                self.undock(lvl)
+                last = timeit.default_timer()
+            time.sleep(max(tick - (timeit.default_timer() - now), 0))
+        self.publish()
+
+
+def _work(*args):
+    Worker(*args).run()
+
+
+class RemoteLevel(object):
+    """The main process's end: starts the worker, sends it the player's
+    input and draws its snapshots.
+
+    'build' is called in the worker as build(level, controls) to add the
+    player, driven by 'controls', and everything else to the level; it
+    returns the sprite that ends the mission when docked with. 'undock' is
+    called with the level when the player is to leave a dock. Both must be
+    module-level functions.
+
+    """
+    def __init__(self, screen, bgd, classes, build, undock, fps=60):
+        self.screen = screen
+        self.bgd = bgd
+        self.animations = _animations(classes)
+        self.drawn_rects = []
+        self.lock = multiprocessing.Lock()
+        raw = sharedctypes.RawArray('i', HEADER + MAX_RECORDS * FIELDS)
+        self.snapshot = numpy.frombuffer(raw, dtype=numpy.intc)
+        # The header and records of the snapshot being drawn.
+        self.header = numpy.zeros(HEADER, dtype=numpy.intc)
+        self.header[ALIVE] = 1
+        self.records = numpy.zeros((0, FIELDS), dtype=numpy.intc)
+        self.inputs = sharedctypes.RawArray('i', INPUTS)
+        self.controls = controls.MouseControls()
+        self.process = multiprocessing.Process(
+            target=_work,
+            args=(raw, self.lock, self.inputs, classes,
+                  screen.get_size(), fps, build, undock))
+        self.process.daemon = True
+
+    def __nonzero__(self):
+        """Return true while the level in the worker is still active."""
+        return bool(self.header[ALIVE])
+
+    @property
+    def ammo(self):
+        return self.header[AMMO]
+
+    @property
+    def ore(self):
+        return self.header[ORE]
+
+    @property
+    def objects(self):
+        return self.header[OBJECTS]
+
+    @property
+    def dock(self):
+        """UNDOCKED, DOCKED or DOCKED_AT_GOAL."""
+        return self.header[DOCK]
+
+    def start(self):
+        """Paint the background and start the worker."""
+        self.bgd.view((0, 0))
+        self.bgd.blit(self.screen, self.screen.get_rect())
+        pygame.display.flip()
+        self.send_input()
+        self.process.start()
+
+    def stop(self):
+        """Tell the worker to quit and wait for it."""
+        self.inputs[QUIT] = 1
+        self.process.join()
+
+    def resume(self):
+        """Tell the worker to undock the player and carry on."""
+        self.header[DOCK] = UNDOCKED
+        self.inputs[RESUME] += 1
+
+    def send_input(self):
+        inputs = self.inputs
+        inputs[POINTER_X], inputs[POINTER_Y] = self.controls.pointer()
+        inputs[FIRING] = self.controls.firing()
+        inputs[THRUSTING] = self.controls.thrusting()
+
+    def update(self):
+        """Send the input, then erase the last frame and draw the latest
+        snapshot. Returns the dirty rects."""
+        self.send_input()
+        with self.lock:
+            if self.snapshot[SEQ] != self.header[SEQ]:
+                self.header[:] = self.snapshot[:HEADER]
+                count = self.header[COUNT]
+                self.records = self.snapshot[
+                    HEADER:HEADER + count * FIELDS].reshape(count, FIELDS)
+                self.records = self.records.copy()
+        if self.bgd.view((self.header[VIEW_LEFT], self.header[VIEW_TOP])):
+            erased_rects = [self.screen.get_rect()]
+        else:
+            erased_rects = present.coalesce(self.drawn_rects)
+        for rect in erased_rects:
+            self.bgd.blit(self.screen, rect)
+        self.drawn_rects = self.draw(self.records)
+        return erased_rects + self.drawn_rects
+
+    def draw(self, records):
+        """Blit the sprites in 'records' at their screen positions. Returns
+        the list of dirty rects."""
+        left, top = self.header[VIEW_LEFT], self.header[VIEW_TOP]
+        animations = self.animations
+        blit = self.screen.blit
+        dirty = []
+        for kind, anim, frameno, angle, x, y in records.tolist():
+            animation = animations[kind][anim]
+            image = _frame(animation, frameno)
+            if angle:
+                image = animation.rotations.get(frameno, image, angle)[0]
+            rect = image.get_rect(center=(x - left, y - top))
+            dirty.append(blit(image, rect))
+        return dirty
@@ -0,0 +1,119 @@
+"""Uniform-grid spatial hash for finding nearby sprites."""
+#
+# Copyright (c) Gordon McNutt, 2013
+#
+
+import pygame
+
+DEFAULT_CELL_SIZE = 128
+
+
+class SpatialHash(pygame.sprite.AbstractGroup):
+    """A sprite group that also buckets its sprites into a uniform grid of
+    square cells keyed on their maprects.
+
+    Because it is a group, sprite.kill() removes a sprite from the grid along
+    with all its other groups. Sprites that move must be reindexed (see
+    reindex()) so that they stay in the right cells.
+
+    """
+    def __init__(self, cell_size=DEFAULT_CELL_SIZE):
+        super(SpatialHash, self).__init__()
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def _span(self, rect):
+        """Return the range of cells (left, top, right, bottom), inclusive,
+        covered by 'rect'."""
+        size = self.cell_size
+        return (rect.left // size, rect.top // size,
+                (rect.right - 1) // size, (rect.bottom - 1) // size)
+
+    def _insert(self, sprite, span):
+        cells = self.cells
+        for x in range(span[0], span[2] + 1):
+            for y in range(span[1], span[3] + 1):
+                key = x, y
+                cell = cells.get(key)
+                if cell is None:
+                    cell = cells[key] = set()
+                cell.add(sprite)
+
+    def _delete(self, sprite, span):
+        cells = self.cells
+        for x in range(span[0], span[2] + 1):
+            for y in range(span[1], span[3] + 1):
+                key = x, y
+                cell = cells[key]
+                cell.discard(sprite)
+                if not cell:
+                    del cells[key]
+
+    def add_internal(self, sprite, *args):
+        span = self._span(sprite.maprect)
+        self.spritedict[sprite] = span
+        self._insert(sprite, span)
+
+    def remove_internal(self, sprite):
+        self._delete(sprite, self.spritedict.pop(sprite))
+
+    def reindex(self, sprite):
+        """Move 'sprite' to the cells under its current maprect. Cheap when
+        it has not left its old cells."""
+        old = self.spritedict[sprite]
+        span = self._span(sprite.maprect)
+        if span != old:
+            self._delete(sprite, old)
+            self._insert(sprite, span)
+            self.spritedict[sprite] = span
+
+    def reindex_all(self):
+        """Reindex every sprite in the group."""
+        for sprite in list(self.spritedict):
+            self.reindex(sprite)
+
+    def near(self, rect):
+        """Return the set of sprites in the cells under 'rect' and in the
+        ring of cells around them.
+
+        The extra ring catches sprites whose rect has grown past their
+        maprect, as it does when an image is rotated.
+
+        """
+        left, top, right, bottom = self._span(rect)
+        cells = self.cells
+        found = set()
+        for x in range(left - 1, right + 2):
+            for y in range(top - 1, bottom + 2):
+                cell = cells.get((x, y))
+                if cell:
+                    found.update(cell)
+        return found
+
+    def border(self, rect):
+        """Return the set of sprites in the cells that straddle the edge of
+        'rect' and in the ring of cells just outside it.
+
+        Any other sprite near 'rect' is in cells wholly inside it. A sprite
+        moving less than a cell at a time can only cross the edge of 'rect'
+        while it is in one of the returned cells.
+
+        """
+        size = self.cell_size
+        left, top, right, bottom = self._span(rect)
+        # The range of cells wholly inside rect.
+        in_left = -(-rect.left // size)
+        in_top = -(-rect.top // size)
+        in_right = rect.right // size - 1
+        in_bottom = rect.bottom // size - 1
+        cells = self.cells
+        found = set()
+        for x in range(left - 1, right + 2):
+            inside_x = in_left <= x <= in_right
+            for y in range(top - 1, bottom + 2):
+                if inside_x and in_top <= y <= in_bottom:
+                    continue
+                cell = cells.get((x, y))
+                if cell:
+                    found.update(cell)
+        return found
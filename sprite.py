@@ -4,9 +4,12 @@
 #
 
 import animation
+import budget
+import controls as ctrl
 import json
 import pygame
 import math
+import pool
 import random
 import vector
 
@@ -35,17 +38,118 @@ class Pickup(object):
     pass
 
 
+class Kinematic(object):
+    """Mix-in for sprites that just drift and spin. While in a level their
+    position, velocity and angle live in the level's KinematicsStore, which
+    moves them all at once, instead of on the sprite. Put it before the
+    sprite class in the bases so that drift() is overridden."""
+
+    kinematics = None  # the store while in a level
+    slot = None  # row in the store's arrays
+
+    def _get_velocity(self):
+        if self.kinematics is None:
+            return self._velocity
+        return self.kinematics.vel[self.slot].tolist()
+
+    def _set_velocity(self, velocity):
+        if self.kinematics is None:
+            self._velocity = velocity
+        else:
+            self.kinematics.vel[self.slot] = velocity
+
+    velocity = property(_get_velocity, _set_velocity)
+
+    def _get_angle(self):
+        if self.kinematics is None:
+            return self._angle
+        return float(self.kinematics.angle[self.slot])
+
+    def _set_angle(self, angle):
+        if self.kinematics is None:
+            self._angle = angle
+        else:
+            self.kinematics.angle[self.slot] = angle
+
+    angle = property(_get_angle, _set_angle)
+
+    def _get_angular_velocity(self):
+        if self.kinematics is None:
+            return self._angular_velocity
+        return float(self.kinematics.spin[self.slot])
+
+    def _set_angular_velocity(self, angular_velocity):
+        if self.kinematics is None:
+            self._angular_velocity = angular_velocity
+        else:
+            self.kinematics.spin[self.slot] = angular_velocity
+
+    angular_velocity = property(_get_angular_velocity, _set_angular_velocity)
+
+    def drift(self, ticks=1):
+        """The store does the moving."""
+        if self.kinematics is None:
+            super(Kinematic, self).drift(ticks)
+
+
+class Pooled(object):
+    """Mix-in for short-lived sprites that are recycled when killed. Each
+    class needs its own 'pool'; make instances with spawn() to draw on it."""
+
+    pool = None
+    persistent = False  # not worth keeping when far away
+
+    @classmethod
+    def spawn(cls, **kwargs):
+        return cls.pool.get(**kwargs)
+
+    def kill(self):
+        if self.alive():
+            super(Pooled, self).kill()
+            self.pool.release(self)
+
+
 class BaseSprite(pygame.sprite.DirtySprite):
     """A sprite with a rect for collision detection and a maprect for showing
-    in a viewer.
+    in a viewer. Both are in map coordinates; the level offsets them by its
+    viewrect when drawing.
+
+    The level updates sprites far from the view less often (see
+    Level.update_sprites()). 'lod' is the distance band it last put the
+    sprite in, 0 being near the view, and update() is passed the number of
+    ticks since the last one. Sprites that must run every tick, whatever the
+    distance, set 'full_rate'.
+
+    Under the level's entity budget 'budget_priority' is how much the
+    sprite is worth keeping, or None to exempt it, and 'over_budget' is
+    what to do with it when there is no room (see budget.EntityBudget).
+
+    Timers count ticks at 'fps', which the level sets to its own with
+    set_fps() when the sprite is added. 'timers' names the attributes that
+    hold them, so that they can be rescaled.
     """
+    full_rate = False
+    budget_priority = 1
+    over_budget = budget.DROP
+    timers = ()
+
     def __init__(self, fps=60):
         super(BaseSprite, self).__init__()
         self.dirty = 2  #  Always dirty (repainted each frame)
         self._layer = DEFAULT_LAYER
-        self.maprect = None  # Offset from map viewer ULC
-        self.rect = None  # Offset from universal ULC
+        self.maprect = None  # Unrotated footprint on the map
+        self.rect = None  # Current image on the map
         self.fps = fps
+        self.lod = 0
+        self.lod_tick = 0  # level tick of the last update
+
+    def set_fps(self, fps):
+        """Count ticks at 'fps' from now on, rescaling the timers."""
+        if fps != self.fps:
+            scale = fps / float(self.fps)
+            for name in self.timers:
+                setattr(self, name, getattr(self, name) * scale)
+            self.fps = fps
 
     def move(self, offset):
         """Move the sprite by 'offset'."""
@@ -55,17 +159,14 @@ class BaseSprite(pygame.sprite.DirtySprite):
 
     def destroy(self):
         """Explode and exit stage."""
-        self.level.add(Explosion(), self.maprect.center)
+        self.level.add(Explosion.spawn(), self.maprect.center)
         self.kill()
 
-    def scroll(self, offset):
-        self.rect.move_ip(offset)
-
     def put_at(self, level, maploc):
         self.level = level
         self.maprect = self.rect.copy()
         self.maprect.center = maploc
-        self.rect.center = vector.subtract(maploc, level.viewrect.topleft)
+        self.rect.center = maploc
 
     def hit(self):
         """Take damage."""
@@ -84,6 +185,8 @@ class ModelObject(BaseSprite):
     """
 
     __model__ = None
+    rotation_step = 1  # degrees between cached rotations
+    persistent = True  # kept as a record while far from the player
 
     def __init__(self, velocity=None, angular_velocity=0):
         super(ModelObject, self).__init__()
@@ -92,16 +195,37 @@ class ModelObject(BaseSprite):
                             format(type(velocity)))
         self.animation_view = self.__model__['default'].get_view()
         self._set_image(self.animation_view.frame)
+        self.first_mask = self.mask
+        self.velocity = velocity or [0, 0]
+        self.angular_velocity = angular_velocity
+        self.angle = 0
+
+    def reset(self, velocity=None, angular_velocity=0):
+        """Put a killed sprite back in the state __init__ leaves it in, so it
+        can be used again, without remaking the first frame's mask."""
+        self.animation_view = self.__model__['default'].get_view()
+        self._set_image(self.animation_view.frame, mask=self.first_mask)
         self.velocity = velocity or [0, 0]
         self.angular_velocity = angular_velocity
         self.angle = 0
 
-    def _set_image(self, image, original=True, remask=True):
+    def get_state(self):
+        """Return what a dormant record needs, besides the motion, to
+        rebuild this sprite with set_state(). Must be plain data."""
+        return None
+
+    def set_state(self, state):
+        """Restore the state returned by get_state() to a new sprite."""
+        pass
+
+    def _set_image(self, image, original=True, remask=True, mask=None):
         """Set the current sprite image and rect and rebuild the collision
-        mask. Unless rotated remember this as the original prior to
-        rotation."""
+        mask, or use 'mask' if given. Unless rotated remember this as the
+        original prior to rotation."""
         self.image = image
-        if remask:
+        if mask:
+            self.mask = mask
+        elif remask:
             self.mask = pygame.mask.from_surface(self.image)
         old_rect = self.rect
         self.rect = self.image.get_rect()
@@ -117,89 +241,145 @@ class ModelObject(BaseSprite):
 
     def _rotate_image(self):
         """Rotate the current image and update the rect and collision
-        mask. Recenters the rotated image in the old location."""
+        mask. Recenters the rotated image in the old location.
+
+        The angle is rounded to the nearest multiple of rotation_step and
+        the result comes from the animation's rotation cache, so sprites
+        sharing a model share the rotated images and masks.
+
+        """
         center = self.rect.center
-        image = pygame.transform.rotate(self.original_image, self.angle)
-        self._set_image(image, False)
+        view = self.animation_view
+        image, mask = view.animation.rotations.get(view.frameno,
+                                                   view.frame,
+                                                   self.quantized_angle())
+        self._set_image(image, False, mask=mask)
         self.rect.center = center
 
-    def update(self):
-        """Update the animation then move and rotate."""
-        if self.animation_view.update():
+    def quantized_angle(self):
+        """Return the angle the image is drawn at: the nearest multiple of
+        rotation_step, in [0, 360)."""
+        step = self.rotation_step
+        return int(round(self.angle / float(step))) * step % 360
+
+    def update(self, ticks=1):
+        """Update the animation then move and rotate by 'ticks' ticks' worth.
+        Far from the view the animation is left alone, as nobody sees it."""
+        if self.lod == 0 and self.animation_view.update():
             self._set_image(self.animation_view.frame, remask=False)
-        self.move(self.velocity)
-        self.angle += self.angular_velocity
+        self.drift(ticks)
+
+    def drift(self, ticks=1):
+        """Move and rotate by 'ticks' ticks' worth of velocity."""
+        self.move(vector.scalar_multiply(self.velocity, ticks))
+        self.angle += self.angular_velocity * ticks
 
     def draw_angle(self):
         """Draw a line representing the angle """
         direction = vector.from_angle(self.angle)
         vect = vector.scalar_multiply(direction, 20)
-        endpos = vector.add(self.rect.center, vect)
+        center = self.level.to_screen(self.rect.center)
+        endpos = vector.add(center, vect)
         return pygame.draw.line(self.level.screen, (255, 255, 0),
-                                self.rect.center,
+                                center,
                                 endpos)
 
     def draw_velocity(self):
         """Draw a line representing the velocity."""
         vect = vector.scalar_multiply(self.velocity, 10)
-        endpos = vector.add(self.rect.center, vect)
+        center = self.level.to_screen(self.rect.center)
+        endpos = vector.add(center, vect)
         return pygame.draw.line(self.level.screen, (0, 255, 255),
-                                self.rect.center,
+                                center,
                                 endpos)
 
 
-class TickShot(ModelObject, CollidesWithPlayer):
+class TickShot(Pooled, Kinematic, ModelObject, CollidesWithPlayer):
     """Bullet from a TickShip."""
+    timers = ('ttl',)
 
     def __init__(self, **kwargs):
         super(TickShot, self).__init__(**kwargs)
-        self.ttl = 3 * 60  # FIXME: assumes 60 fps
+        self.ttl = 3 * self.fps
 
-    def update(self):
-        super(TickShot, self).update()
-        self.ttl -= 1
+    def reset(self, **kwargs):
+        super(TickShot, self).reset(**kwargs)
+        self.ttl = 3 * self.fps
+
+    def update(self, ticks=1):
+        super(TickShot, self).update(ticks)
+        self.ttl -= ticks
         if self.ttl <= 0:
             self.kill()
 
 
 class TickShip(ModelObject, EnemyShip):
     """Small enemy ship."""
+    rotation_step = 3
+    budget_priority = 2
+    over_budget = budget.DEFER
+    timers = ('ticks_to_fire',)
 
     def __init__(self, **kwargs):
         super(TickShip, self).__init__(**kwargs)
         self.ticks_to_fire = self.fps
 
-    def update(self):
-        super(TickShip, self).update()
-        self._shoot()
+    def get_state(self):
+        return self.ticks_to_fire / float(self.fps)  # in seconds
+
+    def set_state(self, state):
+        self.ticks_to_fire = state * self.fps
+
+    def update(self, ticks=1):
+        super(TickShip, self).update(ticks)
+        self._shoot(ticks)
 
-    def _shoot(self):
-        self.ticks_to_fire -= 1
+    def _shoot(self, ticks=1):
+        """Fire every second. Far from the view the shots would expire
+        before anyone saw them, so none are made."""
+        self.ticks_to_fire -= ticks
         if self.ticks_to_fire <= 0:
-            direction = vector.from_angle(self.angle + 180)
-            velocity = vector.scalar_multiply(direction, 3)
-            location = vector.add(
-                self.maprect.center,
-                vector.scalar_multiply(direction,
-                                       self.maprect.width / 2))
-            self.level.add(TickShot(velocity=list(velocity)),
-                           location)
+            if not self.lod:
+                direction = vector.from_angle(self.angle + 180)
+                velocity = vector.scalar_multiply(direction, 3)
+                location = vector.add(
+                    self.maprect.center,
+                    vector.scalar_multiply(direction,
+                                           self.maprect.width / 2))
+                self.level.add(TickShot.spawn(velocity=list(velocity)),
+                               location)
             self.ticks_to_fire = self.fps
 
 
 class TickFactory(ModelObject, EnemyShip):
     """Big ship that spawns ticks."""
     color = (255, 128, 0)
+    budget_priority = 4
+    over_budget = budget.EVICT
+    timers = ('ticks_to_spawn',)
 
     def __init__(self, **kwargs):
         super(TickFactory, self).__init__(**kwargs)
         self.hits = 0
         self.ticks_to_spawn = self.fps * 2.1
 
-    def update(self):
-        super(TickFactory, self).update()
-        self.ticks_to_spawn -= 1
-        if self.ticks_to_spawn <= 0:
+    def get_state(self):
+        return self.hits, self.ticks_to_spawn / float(self.fps)
+
+    def set_state(self, state):
+        self.hits, seconds = state
+        self.ticks_to_spawn = seconds * self.fps
+        if self.hits >= 3:
+            self.animation_view = self.__model__['damaged'].get_view()
+            self._set_image(self.animation_view.frame)
+
+    def update(self, ticks=1):
+        super(TickFactory, self).update(ticks)
+        self.ticks_to_spawn -= ticks
+        # Hold the spawn while the budget has no room for another tick, so
+        # a full level doesn't fill up with ticks waiting to be added.
+        if self.ticks_to_spawn <= 0 and \
+                not self.level.budget.refuses_class(TickShip):
             direction = vector.from_angle(self.angle + 180)
             velocity = vector.scalar_multiply(direction, 3)
             location = vector.add(
@@ -221,7 +401,7 @@ class TickFactory(ModelObject, EnemyShip):
         # Create an explosion slightly off-center.
         offset = vector.subtract(vector.randint(10, 10), (5, 5))
         center = vector.add(self.maprect.center, offset)
-        self.level.add(Explosion(), center)
+        self.level.add(Explosion.spawn(), center)
         if self.hits == 3:
             # Change sprite to show damage.
             self.animation_view = self.__model__['damaged'].get_view()
@@ -231,10 +411,12 @@ class TickFactory(ModelObject, EnemyShip):
             self.destroy()
 
 
-class Asteroid(ModelObject, CollidesWithPlayer, CollidesWithPlayerShot):
+class Asteroid(Kinematic, ModelObject, CollidesWithPlayer,
+               CollidesWithPlayerShot):
     """Rotating destructible rock."""
     color = (160, 160, 160)
-    pass
+    rotation_step = 3
+    budget_priority = 2
 
 
 class OreAsteroid(Asteroid):
@@ -251,6 +433,8 @@ class OreAsteroid(Asteroid):
 class BigAsteroid(Asteroid):
     """A big rock that breaks into smaller ones."""
     color = (128, 128, 128)
+    budget_priority = 3
+    over_budget = budget.EVICT
 
     def destroy(self):
         """Spawn 0-2 child asteroids."""
@@ -266,32 +450,33 @@ class BigAsteroid(Asteroid):
         super(BigAsteroid, self).destroy()
 
 
-class PlayerShot(ModelObject):
+class PlayerShot(Pooled, ModelObject):
     """Bullet sprite."""
-    # To make shots more accurate, overload move(), update() and scroll() so
-    # that instead of incrementing the rects recompute them from the
-    # origin. The normal method of simply incrementing the rects causes
-    # roundoff errors to accumulate and the shot will miss the original target
-    # location.
+    full_rate = True
+    budget_priority = None  # limited by ammo and the rate of fire
+    timers = ('ttl',)
+    # To make shots more accurate, overload move() so that instead of
+    # incrementing the rects it recomputes them from the origin. The normal
+    # method of simply incrementing the rects causes roundoff errors to
+    # accumulate and the shot will miss the original target location.
     def __init__(self, **kwargs):
         super(PlayerShot, self).__init__(**kwargs)
-        self.ttl = 5 * 60
+        self.ttl = 5 * self.fps
+
+    def reset(self, **kwargs):
+        super(PlayerShot, self).reset(**kwargs)
+        self.ttl = 5 * self.fps
 
     def put_at(self, *args):
         super(PlayerShot, self).put_at(*args)
         self.original_rect = self.rect.copy()
         self.original_maprect = self.maprect.copy()
         self.moves = 0
-        self.scroll_offset = 0, 0
-
-    def scroll(self, offset):
-        self.scroll_offset = vector.add(self.scroll_offset, offset)
 
     def move(self, offset):
         self.moves += 1
         toff = vector.scalar_multiply(self.velocity, self.moves)
-        self.rect = self.original_rect.move(vector.add(toff,
-                                                       self.scroll_offset))
+        self.rect = self.original_rect.move(toff)
         self.maprect = self.original_maprect.move(toff)
         self.ttl -= 1
         if self.ttl <= 0:
@@ -299,39 +484,44 @@ class PlayerShot(ModelObject):
 
 
 class PlayerShip(ModelObject):
-    """The player's ship. Responds to mouse position and buttons."""
+    """The player's ship. Responds to mouse position and buttons, or to
+    whatever 'controls' object it is given."""
 
     color = (0, 255, 0)
+    persistent = False
+    full_rate = True
+    budget_priority = None
+    timers = ('fire_wait_tick',)
 
-    def __init__(self, ammo=500, **kwargs):
+    def __init__(self, ammo=500, controls=None, **kwargs):
         super(PlayerShip, self).__init__(**kwargs)
+        self.controls = controls or ctrl.MouseControls()
         self.max_accel = 0.25
         self.accel_damp = 1.0
         self._layer = PLAYER_LAYER
         self.max_shots = 20
-        self.fire_wait_tick = 10
+        self.fire_wait_tick = self.fps // 6
         self.ammo = ammo
         self.ore = 0
 
     def _fire(self):
         """Fire if the mouse button is held down."""
-        buttons = pygame.mouse.get_pressed()
-        if buttons[0] and self.ammo and self.fire_wait_tick <= 0:
-            pos = pygame.mouse.get_pos()
+        if self.controls.firing() and self.ammo and self.fire_wait_tick <= 0:
+            pos = self.level.to_map(self.controls.pointer())
             velocity = vector.subtract(pos, self.rect.center)
             velocity = vector.normalize(velocity)
             velocity = vector.scalar_multiply(velocity, 10)
             velocity = vector.add(velocity, vector.intvector(self.velocity))
-            self.level.add(PlayerShot(velocity=list(velocity)),
+            self.level.add(PlayerShot.spawn(velocity=list(velocity)),
                            self.maprect.center)
-            self.fire_wait_tick = 10
+            self.fire_wait_tick = self.fps // 6
             self.ammo -= 1
         else:
             self.fire_wait_tick -= 1
 
     def _rotate(self):
         """Rotate the ship to face the current mouse position."""
-        mousepos = pygame.mouse.get_pos()
+        mousepos = self.level.to_map(self.controls.pointer())
         dx = self.rect.centerx - mousepos[0]
         dy = self.rect.centery - mousepos[1]
         # Note: dy != 0 since we divide by it; the > N is to prevent erratic
@@ -374,7 +564,7 @@ class PlayerShip(ModelObject):
 
     def _accelerate(self):
         """Computes acceleration and adjusts velocity."""
-        pos = pygame.mouse.get_pos()
+        pos = self.level.to_map(self.controls.pointer())
         errv = pos[0] - self.rect.centerx, pos[1] - self.rect.centery
         accx = self._get_acceleration(errv[0], self.velocity[0])
         accy = self._get_acceleration(errv[1], self.velocity[1])
@@ -382,11 +572,11 @@ class PlayerShip(ModelObject):
             self.velocity = self.velocity[0] + accx, \
                 self.velocity[1] + accy
 
-    def update(self):
+    def update(self, ticks=1):
         """Fire, rotate and move."""
         self._fire()
         self._rotate()
-        if not (pygame.KMOD_SHIFT & pygame.key.get_mods()):
+        if self.controls.thrusting():
             self._accelerate()
         self.move(self.velocity)
 
@@ -394,10 +584,13 @@ class PlayerShip(ModelObject):
         self.ore += 1
 
 
-class Explosion(ModelObject):
+class Explosion(Pooled, ModelObject):
     """An explosion."""
-    def update(self):
-        super(Explosion, self).update()
+    full_rate = True
+    budget_priority = 0
+
+    def update(self, ticks=1):
+        super(Explosion, self).update(ticks)
         if self.animation_view.done:
             self.kill()
 
@@ -405,6 +598,7 @@ class Explosion(ModelObject):
 class Stardock(ModelObject, DocksWithPlayer):
     """The player can dock here."""
     color = (255, 255, 128)
+    budget_priority = None
 
     def __init__(self, **kwargs):
         ModelObject.__init__(self, **kwargs)
@@ -420,10 +614,10 @@ class Stardock(ModelObject, DocksWithPlayer):
         self._set_image(self.animation_view.frame)
         self._cooldown = ticks
 
-    def update(self):
-        super(Stardock, self).update()
+    def update(self, ticks=1):
+        super(Stardock, self).update(ticks)
         if self._cooldown > 0:
-            self._cooldown -= 1
+            self._cooldown = max(self._cooldown - ticks, 0)
             if self._cooldown == 0:
                 self.animation_view = self.__model__['default'].get_view()
                 self._set_image(self.animation_view.frame)
@@ -433,6 +627,13 @@ class Stardock(ModelObject, DocksWithPlayer):
         return self._cooldown == 0
 
 
-class Ore(ModelObject, Pickup):
+class Ore(Kinematic, ModelObject, Pickup):
     """Ore that the player can pick up."""
     color = (0, 128, 255)
+    budget_priority = 3
+    over_budget = budget.EVICT
+
+
+TickShot.pool = pool.Pool(TickShot)
+PlayerShot.pool = pool.Pool(PlayerShot)
+Explosion.pool = pool.Pool(Explosion)
@@ -2,12 +2,17 @@
 
 from level import *
 import argparse
+import assetpack
+import atlas
+from background import FillBackground, StarfieldBackground
 import font
 import minimap
 import model
 import os
+import present
 import pygame
 import random
+import simproc
 import sprite
 import sys
 import ui
@@ -20,20 +25,12 @@ SCROLL = 50
 ROOTDIR = os.path.dirname(__file__)
 IMAGEDIR = os.path.join(ROOTDIR, "art", "png")
 MODELDIR = os.path.join(ROOTDIR, 'models')
-
-
-def align_horz(rect, align):
-    lm = rect.left % align
-    rm = align - (rect.right % align)
-    rect.left -= lm
-    rect.width += (lm + rm)
-
-
-def align_vert(rect, align):
-    lm = rect.top % align
-    rm = align - (rect.bottom % align)
-    rect.top -= lm
-    rect.height += (lm + rm)
+PACKFILE = os.path.join(ROOTDIR, 'models.pack')  # see compileassets.py
+HUD_PERIOD = FPS // 10  # ticks between HUD and minimap updates, for 10 Hz
+ENTITY_LIMIT = 1500  # most sprites in a level, other than the exempt ones
+CLASS_LIMITS = {sprite.TickShip: 200,
+                sprite.TickShot: 300,
+                sprite.Explosion: 100}
 
 
 class UI(object):
@@ -65,60 +62,63 @@ class UI(object):
         pygame.display.update(wrapper.paint())
 
 
-class Background(object):
-
-    def __init__(self, *args, **kwargs):
-        pass
-
-    def blit(self, surf, rect):
-        pass
-
-
-class FillBackground(Background):
-
-    def __init__(self, color=(255, 255, 255), *args, **kwargs):
-        super(FillBackground, self).__init__(*args, **kwargs)
-        self.color = color
-
-    def blit(self, surf, rect):
-        surf.fill(self.color, rect)
-
-
-class TextureBackground(Background):
-
-    def __init__(self, fname, *args, **kwargs):
-        super(TextureBackground, self).__init__(*args, **kwargs)
-        path = os.path.join(IMAGEDIR, fname)
-        self.image = pygame.image.load(path).convert_alpha()
-        self.rect = self.image.get_rect()
-
-    def blit(self, surf, dest):
-        dest2 = dest.copy()
-        align_horz(dest2, self.rect.width)
-        align_vert(dest2, self.rect.height)
-        area = self.rect.copy().move(dest2.topleft)
-        for row in range(dest2.height / area.height):
-            for col in range(dest2.width / area.width):
-                surf.blit(self.image, area)
-                area.left += area.width
-            area.top += area.height
-            area.left = dest2.left
+MODEL_MAP = [(sprite.PlayerShip, 'sinistar_Bship'),
+             (sprite.PlayerShot, 'sinistar_bullet_12_3'),
+             (sprite.BigAsteroid, 'tyrian_rock0'),
+             (sprite.Asteroid, 'tyrian_rock1a'),
+             (sprite.TickShip, 'sinistar_ship3'),
+             (sprite.TickShot, 'sinistar_bullet_4_3'),
+             (sprite.Explosion, 'sinistar_Explode3'),
+             (sprite.Stardock, 'sinistar_base'),
+             (sprite.OreAsteroid, 'ore_asteroid'),
+             (sprite.Ore, 'ore'),
+             (sprite.TickFactory, 'tick_factory'),
+             ]
+
+
+def load_models(packed=True, report=False):
+    """Load the model for each sprite class, with all their frames packed
+    into one texture atlas unless 'packed' is False. Models are taken from
+    the asset pack if there is one built from the current image files,
+    else from the image files themselves, which are decoded in parallel.
+    With 'report' the time taken by each model loaded from image files is
+    printed. Needs a display mode to be set first."""
+    frames = atlas.Atlas() if packed else None
+    models = {}
+    if os.path.exists(PACKFILE):
+        try:
+            models = assetpack.load(PACKFILE, FPS, frames, MODELDIR)
+        except ValueError as e:
+            print('{}: {}; loading the image files'.format(PACKFILE, e))
+    missing = [name for cls, name in MODEL_MAP if name not in models]
+    loaded, seconds = model.load_all(
+        [os.path.join(MODELDIR, name) for name in missing], FPS, frames)
+    for name, mod, elapsed in zip(missing, loaded, seconds):
+        models[name] = mod
+        if report:
+            print('{}: {:.1f}ms'.format(name, elapsed * 1000))
+    for cls, name in MODEL_MAP:
+        cls.__model__ = models[name]
+
+
+def random_velocities(num):
+    """Return 'num' random velocities from (-3, -3) to (4, 4), as lists."""
+    return vector.batch_subtract([vector.randint(7, 7) for i in range(num)],
+                                 (3, 3)).tolist()
 
 
 def add_ticks(level, num):
-    for i in range(num):
-        vel = vector.subtract(vector.randint(7, 7), (3, 3))
+    for vel in random_velocities(num):
         position = level.get_offscreen_position((22, 22))
-        level.add(sprite.TickShip(velocity=list(vel),
+        level.add(sprite.TickShip(velocity=vel,
                                   angular_velocity=random.random() * 5),
                   position)
 
 
 def add_asteroids(level, num):
-    for i in range(num):
-        vel = vector.subtract(vector.randint(7, 7), (3, 3))
+    for vel in random_velocities(num):
         position = level.get_offscreen_position((50, 50))
-        level.add(sprite.BigAsteroid(velocity=list(vel),
+        level.add(sprite.BigAsteroid(velocity=vel,
                                      angular_velocity=random.random() * 5),
                   position)
 
@@ -127,13 +127,13 @@ def add_tick_factories(level, num):
         position = level.get_offscreen_position((50, 50))
         level.add(sprite.TickFactory(angular_velocity=1), position)
 
-def run(screen, args, gui):
-    level = Level(screen=screen,
-                  fps=FPS,
-                  bgd=FillBackground((0, 0, 0)),
-                  show_boxes=False, show_grid=args.grid)
-
-    level.add(sprite.PlayerShip(), level.rect.center)
+def build(level, controls=None):
+    """Add the player, driven by 'controls' (default: mouse and keyboard),
+    the stardocks and the enemies to the level. Returns the stardock that
+    ends the mission."""
+    level.budget.limit = ENTITY_LIMIT
+    level.budget.class_limits.update(CLASS_LIMITS)
+    level.add(sprite.PlayerShip(controls=controls), level.rect.center)
     level.view(level.player)
 
     level.add(sprite.Stardock(angular_velocity=1),
@@ -145,13 +145,57 @@ def run(screen, args, gui):
     add_tick_factories(level, 10)
     #add_ticks(level, 10)
     add_asteroids(level, 100)
+    return stardock2
+
+
+def undock(level):
+    """Restock the player and send them off from the dock."""
+    level.player.fire_wait_tick = FPS // 6  # prevent gratuitous shot
+    level.player.ammo = 500
+    level.dock.start_cooldown(3 * FPS)
+    level.dock = None
+
+
+def make_background(args):
+    if args.stars:
+        return StarfieldBackground()
+    return FillBackground((0, 0, 0))
+
+
+def poll(labels):
+    for label in labels:
+        label.poll()
+
+
+def tick_hud(hud, dirty):
+    """Refresh the HUD widgets, first invalidating any that overlap the
+    rects in 'dirty', which the level has painted. Their contents are
+    brought up to date separately. Returns the rects the widgets
+    repainted."""
+    for widget in hud:
+        if widget.rect.collidelist(dirty) >= 0:
+            widget.invalidate()
+    painted = []
+    for widget in hud:
+        painted += widget.refresh()
+    return painted
+
+
+def run(screen, args, gui):
+    if args.worker:
+        return run_worker(screen, args, gui)
+
+    level = Level(screen=screen,
+                  fps=FPS,
+                  bgd=make_background(args),
+                  show_boxes=False, show_grid=args.grid)
+    stardock2 = build(level)
 
     large_font = font.AfterFont(os.path.join(ROOTDIR, 'large_font.json'),
                                 IMAGEDIR)
 
     clock = pygame.time.Clock()
     def fps_tick():
-        clock.tick(FPS)
         return int(clock.get_fps())
 
     fps_counter = ui.ValueLabel(pos=(0, screen.get_rect().height - 20),
@@ -181,9 +225,26 @@ def run(screen, args, gui):
         font=large_font,
         surf=screen)
 
+    presenter = present.Presenter(screen, flip_ratio=args.flip_ratio)
+    labels = [fps_counter, ammo_counter, ore_counter, obj_counter]
+    hud = labels + [mmap]
+    # The level runs these in the time each frame has left.
+    level.scheduler.add('hud', lambda: poll(labels), period=HUD_PERIOD)
+    level.scheduler.add('minimap', mmap.replot, period=HUD_PERIOD)
+    perf_overlay = None
+    if args.perf:
+        screen_rect = screen.get_rect()
+        perf_overlay = ui.PerfOverlay(level=level, pos=(0, 0),
+                                      font=large_font, surf=screen,
+                                      bgcolor=(32, 32, 32),
+                                      presenter=presenter)
+        perf_overlay.rect.bottomright = screen_rect.bottomright
+        hud.append(perf_overlay)
+
     gui.prompt("Proceed to Stardock 2.")
 
     level.start()
+    clock.tick()
     loops = 0
     while level:
         for event in pygame.event.get():
@@ -195,6 +256,8 @@ def run(screen, args, gui):
                 elif event.unicode == u'n' and args.step:
                     level.update()
                     obj_counter.tick()
+                    if perf_overlay:
+                        perf_overlay.sample()
                 elif event.key == pygame.K_UP:
                     level.scroll((0, -1 * SCROLL))
                 elif event.key == pygame.K_DOWN:
@@ -206,26 +269,78 @@ def run(screen, args, gui):
                 else:
                     #print('key:{}'.format(event))
                     pass
+        # Frames are drawn as fast as allowed; the level runs its ticks at
+        # FPS whatever the frame rate, drawing between them.
+        elapsed = clock.tick(args.max_fps) / 1000.0
         dirty = []
         if not args.step:
-            dirty = level.update()
+            dirty = level.update(elapsed)
+            # Sampled every frame, unlike the scheduled HUD updates, so
+            # the graph shows the slow frames too.
+            if perf_overlay:
+                perf_overlay.sample()
 
-        dirty.append(fps_counter.tick())
-        dirty.append(ammo_counter.tick())
-        dirty.append(ore_counter.tick())
-        dirty.append(mmap.paint())
-        dirty.append(obj_counter.tick())
-        pygame.display.update(dirty)
+        presenter.present(dirty + tick_hud(hud, dirty))
 
         if level.dock:
             gui.prompt('Docking')
-            level.player.fire_wait_tick = 10  # prevent gratuitous shot
             if level.dock == stardock2:
                 gui.prompt("Mission Completed!")
-                level.player.fire_wait_tick = 10  # prevent gratuitous shot
-            level.player.ammo = 500
-            level.dock.start_cooldown(3 * 60)
-            level.dock = None
+            undock(level)
+            clock.tick()  # don't count the time spent in prompts
+
+
+def run_worker(screen, args, gui):
+    """Like run(), but with the level simulated in a worker process. Only
+    the FPS, ammo and ore counters are shown."""
+    level = simproc.RemoteLevel(screen, make_background(args),
+                                [pair[0] for pair in MODEL_MAP], build,
+                                undock, fps=FPS)
+    large_font = font.AfterFont(os.path.join(ROOTDIR, 'large_font.json'),
+                                IMAGEDIR)
+    clock = pygame.time.Clock()
+    fps_counter = ui.ValueLabel(pos=(0, screen.get_rect().height - 20),
+                                title="FPS",
+                                value_func=lambda: int(clock.get_fps()),
+                                font=large_font,
+                                surf=screen)
+    ammo_counter = ui.ValueLabel(
+        pos=(fps_counter.rect.right, fps_counter.rect.top),
+        title="Ammo",
+        value_func=lambda: level.ammo,
+        font=large_font,
+        surf=screen)
+    ore_counter = ui.ValueLabel(
+        pos=(ammo_counter.rect.right, ammo_counter.rect.top),
+        title="Ore",
+        value_func=lambda: level.ore,
+        font=large_font,
+        surf=screen)
+    presenter = present.Presenter(screen, flip_ratio=args.flip_ratio)
+    hud = [fps_counter, ammo_counter, ore_counter]
+
+    gui.prompt("Proceed to Stardock 2.")
+
+    level.start()
+    try:
+        while level:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    sys.exit()
+                elif event.type == pygame.KEYDOWN and event.unicode == u'q':
+                    return
+            clock.tick(FPS)
+            dirty = level.update()
+            poll(hud)
+            presenter.present(dirty + tick_hud(hud, dirty))
+
+            if level.dock:
+                gui.prompt('Docking')
+                if level.dock == simproc.DOCKED_AT_GOAL:
+                    gui.prompt("Mission Completed!")
+                level.resume()
+    finally:
+        level.stop()
 
 
 if __name__ == '__main__':
@@ -238,6 +353,22 @@ if __name__ == '__main__':
                         help='Run in a window instead of fullscreen')
     parser.add_argument('--grid', default=False, action='store_true',
                         help='Show grid')
+    parser.add_argument('--perf', default=False, action='store_true',
+                        help='Show frame timings')
+    parser.add_argument('--load-times', default=False, action='store_true',
+                        help='print how long each model takes to load')
+    parser.add_argument('--worker', default=False, action='store_true',
+                        help='simulate the level in a worker process')
+    parser.add_argument('--stars', default=False, action='store_true',
+                        help='show a scrolling starfield behind the level')
+    parser.add_argument('--flip-ratio', type=float,
+                        default=present.DEFAULT_FLIP_RATIO,
+                        help='flip the whole display when this fraction of '
+                        'it is dirty')
+    parser.add_argument('--max-fps', type=int, default=0,
+                        help='most frames to draw per second, such as the '
+                        'display refresh rate (default: no limit); the '
+                        'game itself always runs at {}'.format(FPS))
     args = parser.parse_args()
 
     pygame.init()
@@ -250,21 +381,7 @@ if __name__ == '__main__':
                                 IMAGEDIR)
     pygame.mouse.set_cursor(*pygame.cursors.diamond)
 
-    # Load all the models
-    model_map = [(sprite.PlayerShip, 'sinistar_Bship'),
-                 (sprite.PlayerShot, 'sinistar_bullet_12_3'),
-                 (sprite.BigAsteroid, 'tyrian_rock0'),
-                 (sprite.Asteroid, 'tyrian_rock1a'),
-                 (sprite.TickShip, 'sinistar_ship3'),
-                 (sprite.TickShot, 'sinistar_bullet_4_3'),
-                 (sprite.Explosion, 'sinistar_Explode3'),
-                 (sprite.Stardock, 'sinistar_base'),
-                 (sprite.OreAsteroid, 'ore_asteroid'),
-                 (sprite.Ore, 'ore'),
-                 (sprite.TickFactory, 'tick_factory'),
-                 ]
-    for pair in model_map:
-        pair[0].__model__ = model.load(os.path.join(MODELDIR, pair[1]), FPS)
+    load_models(report=args.load_times)
 
     gui = UI(screen, large_font)
     run(screen, args, gui)
@@ -2,9 +2,41 @@ import unittest
 
 import animation_test
 import model_test
+import spatial_test
+import level_test
+import kinematics_test
+import vector_test
+import pool_test
+import simproc_test
+import atlas_test
+import assetpack_test
+import font_test
+import background_test
+import sectors_test
+import scheduler_test
+import budget_test
+import minimap_test
+import present_test
+import ui_test
 
 suite = unittest.TestSuite()
 suite.addTest(animation_test.suite)
 suite.addTest(model_test.suite)
+suite.addTest(spatial_test.suite)
+suite.addTest(level_test.suite)
+suite.addTest(kinematics_test.suite)
+suite.addTest(vector_test.suite)
+suite.addTest(pool_test.suite)
+suite.addTest(simproc_test.suite)
+suite.addTest(atlas_test.suite)
+suite.addTest(assetpack_test.suite)
+suite.addTest(font_test.suite)
+suite.addTest(background_test.suite)
+suite.addTest(sectors_test.suite)
+suite.addTest(scheduler_test.suite)
+suite.addTest(budget_test.suite)
+suite.addTest(minimap_test.suite)
+suite.addTest(present_test.suite)
+suite.addTest(ui_test.suite)
 
 unittest.TextTestRunner(verbosity=2).run(suite)
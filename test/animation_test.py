@@ -81,11 +81,41 @@ class AnimationViewCheck(unittest.TestCase):
         self.assertFalse(avw.update())
         self.assertFalse(avw.done)
 
+class RotationCacheCheck(unittest.TestCase):
+    def setUp(self):
+        self.image = pygame.image.load('./test1.png')
+        self.cache = animation.RotationCache()
+
+    def test_get(self):
+        image, mask = self.cache.get(0, self.image, 45)
+        self.assertNotEqual(image.get_size(), self.image.get_size())
+        self.assertEqual(mask.get_size(), image.get_size())
+
+    def test_shared(self):
+        first = self.cache.get(0, self.image, 45)
+        second = self.cache.get(0, self.image, 45)
+        self.assertTrue(first[0] is second[0])
+        self.assertTrue(first[1] is second[1])
+
+    def test_keyed_by_frame_and_angle(self):
+        entry = self.cache.get(0, self.image, 45)
+        self.assertFalse(self.cache.get(1, self.image, 45)[0] is entry[0])
+        self.assertFalse(self.cache.get(0, self.image, 90)[0] is entry[0])
+        self.assertEqual(len(self.cache.entries), 3)
+
+    def test_animations_have_caches(self):
+        anim = animation.Animation(frames=[self.image])
+        single = animation.SingleFrameAnimation(self.image)
+        self.assertIsNotNone(anim.rotations)
+        self.assertIsNotNone(single.rotations)
+        self.assertTrue(single.get_view().animation is single)
+
 suite = unittest.TestSuite()
 
 suite.addTest(unittest.makeSuite(AnimationViewCheck, 'test'))
 suite.addTest(unittest.makeSuite(AnimationCheck, 'test'))
 suite.addTest(unittest.makeSuite(AnimationLoadCheck, 'test'))
+suite.addTest(unittest.makeSuite(RotationCacheCheck, 'test'))
 
 if __name__ == '__main__':
     unittest.main()
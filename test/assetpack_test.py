@@ -0,0 +1,91 @@
+import sys
+sys.path.append('../')
+
+import assetpack
+import model
+import os
+import pygame
+import shutil
+import tempfile
+import unittest
+
+pygame.init()
+pygame.display.set_mode((240, 320))
+
+MODELDIR = os.path.join(os.path.dirname(__file__), '..', 'models')
+MODELS = ('sinistar_Explode3', 'sinistar_base')
+
+
+class AssetPackCheck(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.modeldir = os.path.join(self.tmpdir, 'models')
+        for name in MODELS:
+            shutil.copytree(os.path.join(MODELDIR, name),
+                            os.path.join(self.modeldir, name))
+        self.pack = os.path.join(self.tmpdir, 'models.pack')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_load(self):
+        self.assertEqual(assetpack.build(self.modeldir, self.pack), (10, 0))
+        models = assetpack.load(self.pack, 60)
+        self.assertEqual(sorted(models), sorted(MODELS))
+        for name in MODELS:
+            expected = model.load(os.path.join(MODELDIR, name), 60)
+            self.assertEqual(sorted(models[name]), sorted(expected))
+        explosion = models['sinistar_Explode3']['default']
+        expected = model.load(os.path.join(MODELDIR, MODELS[0]), 60)
+        self.assertEqual(explosion.ticks_per_frame,
+                         expected['default'].ticks_per_frame)
+        self.assertFalse(explosion.loop)
+        for frame, original in zip(explosion.frames,
+                                   expected['default'].frames):
+            self.assertEqual(pygame.image.tostring(frame, 'RGBA'),
+                             pygame.image.tostring(original, 'RGBA'))
+
+    def test_incremental(self):
+        assetpack.build(self.modeldir, self.pack)
+        self.assertIsNone(assetpack.build(self.modeldir, self.pack))
+        shutil.copy(os.path.join(self.modeldir, 'sinistar_base', 'green.png'),
+                    os.path.join(self.modeldir, 'sinistar_base',
+                                 'yellow.png'))
+        self.assertEqual(assetpack.build(self.modeldir, self.pack), (0, 9))
+        base = assetpack.load(self.pack, 60)['sinistar_base']
+        self.assertEqual(pygame.image.tostring(base['cooldown'].frame, 'RGBA'),
+                         pygame.image.tostring(base['default'].frame, 'RGBA'))
+
+    def test_not_a_pack(self):
+        with open(self.pack, 'wb') as pack:
+            pack.write(b'nonsense')
+        self.assertRaises(ValueError, assetpack.load, self.pack, 60)
+
+    def test_empty_or_truncated(self):
+        open(self.pack, 'wb').close()
+        self.assertRaises(ValueError, assetpack.load, self.pack, 60)
+        assetpack.build(self.modeldir, self.pack)
+        with open(self.pack, 'rb') as pack:
+            data = pack.read()
+        with open(self.pack, 'wb') as pack:
+            pack.write(data[:-100])
+        self.assertRaises(ValueError, assetpack.load, self.pack, 60)
+        with open(self.pack, 'wb') as pack:
+            pack.write(data[:10])
+        self.assertRaises(ValueError, assetpack.load, self.pack, 60)
+
+    def test_out_of_date(self):
+        assetpack.build(self.modeldir, self.pack)
+        self.assertEqual(
+            sorted(assetpack.load(self.pack, 60, modeldir=self.modeldir)),
+            sorted(MODELS))
+        shutil.copy(os.path.join(self.modeldir, 'sinistar_base', 'green.png'),
+                    os.path.join(self.modeldir, 'sinistar_base',
+                                 'yellow.png'))
+        self.assertRaises(ValueError, assetpack.load, self.pack, 60,
+                          modeldir=self.modeldir)
+
+suite = unittest.makeSuite(AssetPackCheck, 'test')
+
+if __name__ == '__main__':
+    unittest.main()
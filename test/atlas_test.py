@@ -0,0 +1,60 @@
+import sys
+sys.path.append('../')
+
+import atlas
+import model
+import os
+import pygame
+import unittest
+
+pygame.init()
+pygame.display.set_mode((240, 320))
+
+MODELDIR = os.path.join(os.path.dirname(__file__), '..', 'models')
+
+
+def image(size, color=(255, 0, 0, 128)):
+    surf = pygame.Surface(size, pygame.SRCALPHA, 32)
+    surf.fill(color)
+    return surf
+
+
+class AtlasCheck(unittest.TestCase):
+    def setUp(self):
+        self.atlas = atlas.Atlas(page_size=(64, 64))
+
+    def test_copy(self):
+        frame = self.atlas.add(image((10, 20)))
+        self.assertEqual(frame.get_size(), (10, 20))
+        self.assertTrue(frame.get_parent() is self.atlas.pages[0])
+        self.assertEqual(tuple(frame.get_at((5, 5))), (255, 0, 0, 128))
+
+    def test_shelves(self):
+        first = self.atlas.add(image((20, 20)))
+        second = self.atlas.add(image((20, 10)))
+        third = self.atlas.add(image((30, 10)))
+        self.assertEqual(first.get_offset(), (1, 1))
+        self.assertEqual(second.get_offset(), (23, 1))
+        self.assertEqual(third.get_offset(), (1, 23))
+
+    def test_pages(self):
+        for i in range(5):
+            self.atlas.add(image((30, 30)))
+        self.assertEqual(len(self.atlas.pages), 2)
+
+    def test_too_big(self):
+        frame = self.atlas.add(image((100, 10)))
+        self.assertEqual(frame.get_parent().get_size(), (102, 12))
+        small = self.atlas.add(image((10, 10)))
+        self.assertFalse(small.get_parent() is frame.get_parent())
+
+    def test_load_model(self):
+        mod = model.load(os.path.join(MODELDIR, 'sinistar_Explode3'), 60,
+                         self.atlas)
+        for frame in mod['default'].frames:
+            self.assertTrue(frame.get_parent() in self.atlas.pages)
+
+suite = unittest.makeSuite(AtlasCheck, 'test')
+
+if __name__ == '__main__':
+    unittest.main()
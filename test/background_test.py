@@ -0,0 +1,91 @@
+import sys
+sys.path.append('../')
+
+import background
+import os
+import pygame
+import unittest
+
+pygame.init()
+pygame.display.set_mode((240, 320))
+
+TESTDIR = os.path.dirname(__file__)
+
+
+class TextureBackgroundCheck(unittest.TestCase):
+    def setUp(self):
+        self.bgd = background.TextureBackground(os.path.join(TESTDIR,
+                                                             'test1.png'))
+        self.screen = pygame.Surface((100, 70)).convert()
+
+    def tile(self):
+        """ Tile the old way, one image at a time across the screen. """
+        surf = pygame.Surface(self.screen.get_size()).convert()
+        width, height = self.bgd.rect.size
+        for x in range(0, surf.get_width(), width):
+            for y in range(0, surf.get_height(), height):
+                surf.blit(self.bgd.image, (x, y))
+        return surf
+
+    def test_whole_screen(self):
+        self.bgd.blit(self.screen, self.screen.get_rect())
+        self.assertEqual(pygame.image.tostring(self.screen, 'RGB'),
+                         pygame.image.tostring(self.tile(), 'RGB'))
+
+    def test_rects(self):
+        expected = self.tile()
+        self.screen.fill((255, 0, 255))
+        for rect in ((0, 0, 100, 70), (3, 5, 17, 9), (40, 31, 60, 39),
+                     (99, 69, 1, 1)):
+            self.bgd.blit(self.screen, pygame.Rect(rect))
+            self.assertEqual(
+                pygame.image.tostring(self.screen.subsurface(rect), 'RGB'),
+                pygame.image.tostring(expected.subsurface(rect), 'RGB'))
+
+    def test_tiled_once(self):
+        self.bgd.blit(self.screen, pygame.Rect(0, 0, 10, 10))
+        tiled = self.bgd.tiled
+        self.bgd.blit(self.screen, pygame.Rect(50, 50, 10, 10))
+        self.assertTrue(self.bgd.tiled is tiled)
+        self.assertTrue(tiled.get_width() >= 100 + self.bgd.rect.width)
+        self.assertTrue(tiled.get_height() >= 70 + self.bgd.rect.height)
+
+
+class StarfieldBackgroundCheck(unittest.TestCase):
+    def setUp(self):
+        self.bgd = background.StarfieldBackground(seed=1)
+        self.screen = pygame.Surface((300, 200)).convert()
+
+    def paint(self, rect):
+        self.bgd.blit(self.screen, pygame.Rect(rect))
+        return pygame.image.tostring(self.screen.subsurface(rect), 'RGB')
+
+    def test_view(self):
+        self.assertFalse(self.bgd.view((0, 0)))
+        self.assertFalse(self.bgd.view((1, 1)))  # too far to move yet
+        self.assertTrue(self.bgd.view((10, 0)))
+        self.assertFalse(self.bgd.view((10, 0)))
+
+    def test_rects(self):
+        self.bgd.view((123, 456))
+        self.bgd.blit(self.screen, self.screen.get_rect())
+        expected = self.screen.copy()
+        self.screen.fill((255, 0, 255))
+        for rect in ((0, 0, 300, 200), (7, 3, 40, 50), (250, 150, 50, 50)):
+            self.assertEqual(
+                self.paint(rect),
+                pygame.image.tostring(expected.subsurface(rect), 'RGB'))
+
+    def test_layers_move(self):
+        rect = (0, 0, 300, 200)
+        self.bgd.view((0, 0))
+        still = self.paint(rect)
+        self.bgd.view((1000, 0))
+        self.assertNotEqual(self.paint(rect), still)
+        # Every layer moving a whole number of tiles looks the same.
+        self.bgd.view((self.bgd.tile_size[0] * 20, 0))
+        self.assertEqual(self.paint(rect), still)
+
+suite = unittest.TestSuite()
+suite.addTest(unittest.makeSuite(TextureBackgroundCheck, 'test'))
+suite.addTest(unittest.makeSuite(StarfieldBackgroundCheck, 'test'))
@@ -0,0 +1,90 @@
+import sys
+sys.path.append('../')
+
+import budget
+import pygame
+import unittest
+
+
+class Thing(pygame.sprite.Sprite):
+    budget_priority = 1
+    over_budget = budget.DROP
+
+    def __init__(self, pos=(0, 0)):
+        super(Thing, self).__init__()
+        self.maprect = pygame.Rect(0, 0, 4, 4)
+        self.maprect.center = pos
+
+
+class Junk(Thing):
+    budget_priority = 0
+
+
+class Exempt(Thing):
+    budget_priority = None
+
+
+class EntityBudgetCheck(unittest.TestCase):
+    def setUp(self):
+        self.budget = budget.EntityBudget(limit=3, class_limits={Junk: 1})
+
+    def test_unlimited(self):
+        unlimited = budget.EntityBudget()
+        for i in range(100):
+            thing = Thing()
+            self.assertFalse(unlimited.refuses(thing))
+            unlimited.admit(thing)
+        self.assertEqual(unlimited.pressure(), 0.0)
+
+    def test_limits(self):
+        self.budget.admit(Junk())
+        self.assertTrue(self.budget.refuses(Junk()))
+        self.assertFalse(self.budget.refuses(Thing()))
+        self.budget.admit(Thing())
+        self.budget.admit(Thing())
+        self.assertTrue(self.budget.refuses(Thing()))
+        self.assertTrue(self.budget.refuses_class(Thing))
+        self.assertFalse(self.budget.refuses_class(Exempt))
+        self.assertFalse(self.budget.refuses(Exempt()))
+        self.assertEqual(self.budget.pressure(), 1.0)
+
+    def test_killed_leave(self):
+        junk = Junk()
+        self.budget.admit(junk)
+        junk.kill()
+        self.assertEqual(len(self.budget), 0)
+        self.assertFalse(self.budget.refuses(Junk()))
+
+    def test_victim_farthest_lower_priority(self):
+        near, far = Junk((10, 0)), Thing((1000, 0))
+        self.budget.class_limits = {}
+        for thing in (near, far, Thing((500, 0))):
+            self.budget.admit(thing)
+        self.assertTrue(self.budget.victim(Thing(), (0, 0)) is near)
+        self.assertIsNone(self.budget.victim(Junk(), (0, 0)))
+        near.kill()
+        self.assertIsNone(self.budget.victim(Thing(), (0, 0)))
+
+    def test_victim_same_class(self):
+        junk = Junk((10, 0))
+        self.budget.admit(junk)
+        self.budget.admit(Thing((1000, 0)))
+        self.assertTrue(self.budget.victim(Junk(), (0, 0)) is junk)
+
+    def test_victim_excluded(self):
+        near, far = Junk((10, 0)), Junk((1000, 0))
+        thing = Thing((2000, 0))
+        self.budget.class_limits = {}
+        for other in (near, far, thing):
+            self.budget.admit(other)
+        self.assertTrue(self.budget.victim(Thing(), (0, 0), [far]) is near)
+        self.assertIsNone(self.budget.victim(Thing(), (0, 0), [near, far]))
+        self.assertTrue(self.budget.victim(Thing(), (0, 0), [thing]) is far)
+
+    def test_defer_bounded(self):
+        for i in range(budget.MAX_WAITING + 1):
+            self.budget.defer(i, (0, 0))
+        self.assertEqual(len(self.budget.waiting), budget.MAX_WAITING)
+        self.assertEqual(self.budget.waiting[0][0], 1)
+
+suite = unittest.makeSuite(EntityBudgetCheck, 'test')
@@ -0,0 +1,62 @@
+import sys
+sys.path.append('../')
+
+import font
+import os
+import pygame
+import unittest
+
+pygame.init()
+pygame.display.set_mode((240, 320))
+
+ROOTDIR = os.path.join(os.path.dirname(__file__), '..')
+
+
+class AfterFontCheck(unittest.TestCase):
+    def setUp(self):
+        self.font = font.AfterFont(os.path.join(ROOTDIR, 'large_font.json'),
+                                   os.path.join(ROOTDIR, 'art', 'png'))
+        self.rect = pygame.Rect(10, 10, 120, 40)
+
+    def write_glyphs(self, surf, text):
+        """ Write the old way, one glyph at a time. """
+        for area, dest in self.font._glyphs(text.upper(), self.rect):
+            surf.blit(self.font.image, dest, area)
+
+    def surface(self):
+        surf = pygame.Surface((200, 100))
+        surf.fill((32, 64, 96))
+        return surf
+
+    def test_same_as_glyphs(self):
+        expected = self.surface()
+        self.write_glyphs(expected, 'Ammo:42 and more text')
+        written = self.surface()
+        self.font.write(written, self.rect, 'Ammo:42 and more text')
+        self.assertEqual(pygame.image.tostring(written, 'RGB'),
+                         pygame.image.tostring(expected, 'RGB'))
+
+    def test_cached(self):
+        surf = self.surface()
+        self.font.write(surf, self.rect, 'Ore:1')
+        entry = self.font.cache[('Ore:1', self.rect.size)]
+        self.font.write(surf, self.rect.move(5, 5), 'Ore:1')
+        self.assertEqual(len(self.font.cache), 1)
+        self.assertTrue(self.font.cache[('Ore:1', self.rect.size)] is entry)
+
+    def test_lru(self):
+        self.font.cache_size = 2
+        surf = self.surface()
+        for text in ('A', 'B', 'A', 'C'):
+            self.font.write(surf, self.rect, text)
+        self.assertEqual([key[0] for key in self.font.cache], ['A', 'C'])
+
+    def test_nothing_fits(self):
+        surf = self.surface()
+        self.font.write(surf, pygame.Rect(0, 0, 2, 2), 'X')
+        self.assertEqual(self.font.cache[('X', (2, 2))], (None, (0, 0)))
+
+suite = unittest.makeSuite(AfterFontCheck, 'test')
+
+if __name__ == '__main__':
+    unittest.main()
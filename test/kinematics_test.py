@@ -0,0 +1,107 @@
+import sys
+sys.path.append('../')
+
+import kinematics
+import pygame
+import sprite
+import unittest
+
+
+class Rock(sprite.Kinematic, pygame.sprite.Sprite):
+    def __init__(self, center, velocity, angular_velocity=0):
+        super(Rock, self).__init__()
+        self.maprect = pygame.Rect(0, 0, 10, 10)
+        self.maprect.center = center
+        self.rect = self.maprect.copy()
+        self.velocity = velocity
+        self.angular_velocity = angular_velocity
+        self.angle = 0
+
+
+class KinematicsStoreCheck(unittest.TestCase):
+    def setUp(self):
+        self.store = kinematics.KinematicsStore(capacity=2)
+        self.window = pygame.Rect(0, 0, 1000, 1000)
+
+    def test_add(self):
+        rock = Rock((50, 60), [1, 2], 3)
+        self.store.add(rock)
+        self.assertTrue(rock.kinematics is self.store)
+        self.assertEqual(rock.velocity, [1, 2])
+        self.assertEqual(rock.angular_velocity, 3)
+        self.assertEqual(list(self.store.pos[rock.slot]), [50, 60])
+
+    def test_step(self):
+        rock = Rock((50, 60), [1, 2], 3)
+        self.store.add(rock)
+        self.store.step()
+        self.store.step()
+        self.assertEqual(list(self.store.pos[rock.slot]), [52, 64])
+        self.assertEqual(rock.angle, 6)
+        self.assertEqual(rock.maprect.center, (50, 60))
+
+    def test_sync_in_window(self):
+        rock = Rock((50, 60), [1, 2])
+        self.store.add(rock)
+        self.store.sync(self.window, 100)
+        self.store.step()
+        self.assertEqual(self.store.sync(self.window, 100), [rock])
+        self.assertEqual(rock.maprect.center, (51, 62))
+        self.assertEqual(rock.rect.center, (51, 62))
+
+    def test_sync_outside_window(self):
+        rock = Rock((5010, 5010), [10, 0])
+        self.store.add(rock)
+        self.assertEqual(self.store.sync(self.window, 100), [rock])
+        for i in range(8):
+            self.store.step()
+        self.assertEqual(self.store.sync(self.window, 100), [])
+        self.assertEqual(rock.maprect.center, (5010, 5010))
+        self.store.step()
+        self.assertEqual(self.store.sync(self.window, 100), [rock])
+        self.assertEqual(rock.maprect.center, (5100, 5010))
+
+    def test_set_velocity(self):
+        rock = Rock((0, 0), [1, 1])
+        self.store.add(rock)
+        rock.velocity = [-3, 4]
+        self.store.step()
+        self.assertEqual(list(self.store.pos[rock.slot]), [-3, 4])
+
+    def test_kill(self):
+        rock = Rock((0, 0), [1, 1], 2)
+        self.store.add(rock)
+        self.store.step()
+        rock.kill()
+        self.assertEqual(len(self.store), 0)
+        self.assertIsNone(rock.kinematics)
+        self.assertEqual(rock.velocity, [1, 1])
+        self.assertEqual(rock.angle, 2)
+        self.assertEqual(rock.maprect.center, (1, 1))
+        self.assertFalse(self.store.used.any())
+
+    def test_grow(self):
+        rocks = [Rock((i, i), [i, 0]) for i in range(5)]
+        self.store.add(*rocks)
+        self.assertTrue(len(self.store.slots) >= 5)
+        self.store.step()
+        for i, rock in enumerate(rocks):
+            self.assertEqual(list(self.store.pos[rock.slot]), [2 * i, i])
+
+    def test_colors(self):
+        rock = Rock((0, 0), [0, 0])
+        rock.color = (1, 2, 3)
+        plain = Rock((0, 0), [0, 0])
+        self.store.add(rock, plain)
+        self.assertEqual(list(self.store.colors[rock.slot]), [1, 2, 3])
+        self.assertTrue(self.store.colored[rock.slot])
+        self.assertFalse(self.store.colored[plain.slot])
+        slot = rock.slot
+        rock.kill()
+        self.assertFalse(self.store.colored[slot])
+
+
+suite = unittest.makeSuite(KinematicsStoreCheck, 'test')
+
+if __name__ == '__main__':
+    unittest.main()
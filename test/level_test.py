@@ -0,0 +1,277 @@
+import sys
+sys.path.append('../')
+
+import background
+import budget
+import controls
+import level
+import model
+import os
+import pygame
+import sprite
+import unittest
+
+pygame.init()
+pygame.display.set_mode((240, 320))
+
+MODELDIR = os.path.join(os.path.dirname(__file__), '..', 'models')
+for cls, name in ((sprite.PlayerShip, 'sinistar_Bship'),
+                  (sprite.PlayerShot, 'sinistar_bullet_12_3'),
+                  (sprite.Asteroid, 'tyrian_rock1a'),
+                  (sprite.Explosion, 'sinistar_Explode3'),
+                  (sprite.TickShip, 'sinistar_ship3'),
+                  (sprite.TickShot, 'sinistar_bullet_4_3'),
+                  (sprite.TickFactory, 'tick_factory'),
+                  (sprite.OreAsteroid, 'ore_asteroid'),
+                  (sprite.Ore, 'ore')):
+    cls.__model__ = model.load(os.path.join(MODELDIR, name), 60)
+
+
+class Background(background.Background):
+    def blit(self, surf, rect):
+        surf.fill((0, 0, 0), rect)
+
+
+class HeadlessCheck(unittest.TestCase):
+    def setUp(self):
+        self.controls = controls.ScriptedControls(pos=(320, 240))
+        self.level = level.Level(size=(640, 480))
+        self.level.add(sprite.PlayerShip(controls=self.controls),
+                       self.level.rect.center)
+        self.level.view(self.level.player)
+
+    def test_no_screen(self):
+        self.assertIsNone(self.level.screen)
+        self.assertFalse(self.level.render)
+        self.level.start()
+        self.assertEqual(self.level.update(), [])
+
+    def test_controls_steer(self):
+        self.controls.pos = (600, 240)
+        for i in range(30):
+            self.level.update()
+        self.assertTrue(self.level.player.velocity[0] > 0)
+
+    def test_controls_fire(self):
+        self.controls.fire = True
+        for i in range(11):
+            self.level.update()
+        self.assertEqual(len(self.level.player_shots), 1)
+
+    def test_collision(self):
+        rock = sprite.Asteroid(velocity=[0, 0])
+        self.level.add(rock, self.level.player.maprect.center)
+        self.level.update()
+        self.assertFalse(self.level.player.alive())
+        self.assertFalse(rock.alive())
+
+    def test_shots_recycled(self):
+        shot = sprite.PlayerShot.spawn(velocity=[1, 0])
+        self.level.add(shot, (10, 10))
+        shot.kill()
+        again = sprite.PlayerShot.spawn(velocity=[0, 2])
+        self.assertTrue(again is shot)
+        self.assertEqual(again.velocity, [0, 2])
+        self.assertEqual(again.ttl, 5 * 60)
+        self.level.add(again, (20, 20))
+        self.assertTrue(again in self.level.player_shots)
+
+    def test_dormant(self):
+        cullrect = self.level.cullrect
+        position = cullrect.right + 100, cullrect.centery
+        rock = sprite.Asteroid(velocity=[0, 0], angular_velocity=2)
+        self.level.add(rock, position)
+        shot = sprite.PlayerShot.spawn(velocity=[0, 0])
+        self.level.add(shot, (cullrect.left - 100, cullrect.centery))
+        self.level.update()
+        self.assertFalse(rock.alive())
+        self.assertFalse(shot.alive())
+        self.assertEqual(len(self.level.dormant), 1)
+        self.level.player.move((1000, 0))
+        self.level.view(self.level.player)
+        self.level.update()
+        self.assertEqual(len(self.level.dormant), 0)
+        [woken] = [other for other in self.level.all
+                   if isinstance(other, sprite.Asteroid)]
+        self.assertEqual(woken.maprect.center, position)
+        self.assertEqual(woken.angular_velocity, 2)
+
+    def test_timers_use_level_fps(self):
+        slow = level.Level(fps=30, size=(640, 480))
+        ship = slow.add(sprite.TickShip(), (320, 240))
+        self.assertEqual((ship.fps, ship.ticks_to_fire), (30, 30))
+        ship.ticks_to_fire = 15
+        ship.kill()
+        slow.dormant.store(ship)
+        [(woken, position)] = slow.dormant.wake(slow.rect)
+        slow.add(woken, position)
+        self.assertEqual(woken.ticks_to_fire, 15)
+
+    def test_level_of_detail(self):
+        near = sprite.TickShip(velocity=[1, 0])
+        self.level.add(near, (420, 100))
+        far = sprite.TickShip(velocity=[1, 0])
+        self.level.add(far, (3000, 240))
+        self.assertEqual((near.lod, far.lod), (0, len(level.LOD_BANDS) - 1))
+        updates = []
+        far.update = lambda ticks: updates.append(ticks)
+        for i in range(32):
+            self.level.update()
+        self.assertEqual(near.maprect.centerx, 452)
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(updates[-1], 16)
+
+    def test_no_shots_far_away(self):
+        near = sprite.TickShip(velocity=[0, 0])
+        self.level.add(near, (420, 100))
+        far = sprite.TickShip(velocity=[0, 0])
+        self.level.add(far, (3000, 240))
+        for i in range(64):
+            self.level.update()
+        shots = [other for other in self.level.all
+                 if isinstance(other, sprite.TickShot)]
+        self.assertEqual(len(shots), 1)
+        self.assertTrue(far.ticks_to_fire > 0)
+
+    def test_budget_drop(self):
+        self.level.budget.class_limits[sprite.Asteroid] = 1
+        first = self.level.add(sprite.Asteroid(), (100, 100))
+        self.assertTrue(first.alive())
+        self.assertIsNone(self.level.add(sprite.Asteroid(), (110, 100)))
+        self.assertEqual(
+            self.level.budget.pressure_counts[budget.DROP]['Asteroid'], 1)
+        first.kill()
+        self.assertTrue(self.level.add(sprite.Asteroid(), (110, 100)))
+
+    def test_budget_defer(self):
+        self.level.budget.class_limits[sprite.TickShip] = 1
+        first = self.level.add(sprite.TickShip(), (100, 100))
+        waiting = sprite.TickShip()
+        self.assertIsNone(self.level.add(waiting, (110, 100)))
+        self.level.update()
+        self.assertFalse(waiting.alive())
+        first.kill()
+        self.level.update()
+        self.assertTrue(waiting.alive())
+        self.assertEqual(waiting.maprect.center, (110, 100))
+
+    def test_budget_evict(self):
+        self.level.budget.limit = 2
+        near = self.level.add(sprite.Asteroid(), (100, 100))
+        far = self.level.add(sprite.Asteroid(), (2000, 100))
+        ship = self.level.add(sprite.TickShip(), (200, 100))
+        self.assertIsNone(ship)  # deferred: it can't evict
+        self.assertTrue(near.alive() and far.alive())
+        ore = self.level.add(sprite.Ore(), (200, 100))
+        self.assertTrue(ore.alive())
+        self.assertFalse(far.alive())
+        self.assertEqual(len(self.level.dormant), 1)
+
+    def test_budget_full_wakes_nothing(self):
+        self.level.budget.limit = 2
+        self.level.add(sprite.Asteroid(), (100, 100))
+        self.level.add(sprite.Asteroid(), (800, 240))
+        self.assertTrue(self.level.add(sprite.Ore(), (500, 400)))
+        self.assertEqual(len(self.level.dormant), 1)
+        rebuilt = []
+        rebuild = self.level.dormant.rebuild
+        self.level.dormant.rebuild = \
+            lambda record: rebuilt.append(record) or rebuild(record)
+        for i in range(30):
+            self.level.player.move((1, 0))
+            self.level.view(self.level.player)
+            self.level.update()
+            self.assertTrue(self.level.wake_rect.collidepoint(800, 240))
+        self.assertEqual(rebuilt, [])
+        self.assertEqual(len(self.level.dormant), 1)
+
+    def test_spawner_not_evicted(self):
+        self.level.budget.limit = 1
+        rock = self.level.add(sprite.OreAsteroid(), (100, 100))
+        shot = self.level.add(sprite.PlayerShot.spawn(velocity=[0, 0]),
+                              (100, 100))
+        self.level.update()
+        self.assertFalse(rock.alive() or shot.alive())
+        self.assertEqual(len(self.level.dormant), 0)
+        self.assertEqual(
+            self.level.budget.pressure_counts[budget.DROP]['Ore'], 1)
+
+    def test_factory_held_at_cap(self):
+        self.level.budget.class_limits[sprite.TickShip] = 1
+        first = self.level.add(sprite.TickShip(), (100, 100))
+        factory = self.level.add(sprite.TickFactory(), (500, 100))
+        factory.ticks_to_spawn = 1
+        for i in range(10):
+            self.level.update()
+        ships = [other for other in self.level.all
+                 if isinstance(other, sprite.TickShip)]
+        self.assertEqual(ships, [first])
+        self.assertEqual(len(self.level.budget.waiting), 0)
+        self.assertTrue(factory.ticks_to_spawn <= 0)
+        first.kill()
+        self.level.update()
+        ships = [other for other in self.level.all
+                 if isinstance(other, sprite.TickShip)]
+        self.assertEqual(len(ships), 1)
+        self.assertTrue(factory.ticks_to_spawn > 0)
+
+    def test_cull_timed_apart(self):
+        self.level.update()
+        phases = self.level.timer.phases
+        self.assertEqual(phases['cull'], self.level.scheduler.times['cull'])
+        self.assertTrue(phases['cull'] > 0 and phases['jobs'] >= 0)
+        self.level.update()  # not due
+        self.assertEqual(phases['cull'], 0.0)
+
+    def test_fixed_timestep(self):
+        tick = 1.0 / self.level.fps
+        self.level.update(2.5 * tick)
+        self.assertEqual((self.level.substeps, self.level.ticks), (2, 2))
+        self.level.update(0.25 * tick)
+        self.assertEqual((self.level.substeps, self.level.ticks), (0, 2))
+        self.level.update(0.3 * tick)
+        self.assertEqual((self.level.substeps, self.level.ticks), (1, 3))
+
+    def test_catch_up_is_bounded(self):
+        self.level.update(10.0)
+        self.assertEqual(self.level.substeps, level.MAX_SUBSTEPS)
+        self.assertTrue(self.level.lag < 1.0 / self.level.fps)
+
+
+class InterpolationCheck(unittest.TestCase):
+    def setUp(self):
+        self.screen = pygame.Surface((640, 480))
+        self.level = level.Level(screen=self.screen, bgd=Background())
+        self.level.add(sprite.PlayerShip(
+            controls=controls.ScriptedControls(thrust=False)),
+            self.level.rect.center)
+        self.rock = sprite.Asteroid(velocity=[8, 0])
+        self.level.add(self.rock, (100, 100))
+        self.level.start()
+        self.level.update()
+
+    def test_draw_between_ticks(self):
+        self.level.update()
+        rect = self.rock.rect
+        now = self.level.draw_sprites([self.rock], 1.0)[0]
+        half = self.level.draw_sprites([self.rock], 0.5)[0]
+        before = self.level.draw_sprites([self.rock], 0.0)[0]
+        self.assertEqual(now.topleft, rect.topleft)
+        self.assertEqual(half.left, rect.left - 4)
+        self.assertEqual(before.left, rect.left - 8)
+
+    def test_background_scroll_repaints(self):
+        self.level.bgd = background.StarfieldBackground()
+        self.level.start()
+        self.assertNotIn(self.level.rect, self.level.update())
+        self.level.scroll((100, 0))
+        self.assertIn(self.level.rect, self.level.update())
+        self.assertNotIn(self.level.rect, self.level.update())
+
+
+suite = unittest.TestSuite()
+suite.addTest(unittest.makeSuite(HeadlessCheck, 'test'))
+suite.addTest(unittest.makeSuite(InterpolationCheck, 'test'))
+
+if __name__ == '__main__':
+    unittest.main()
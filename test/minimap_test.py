@@ -0,0 +1,97 @@
+import sys
+sys.path.append('../')
+
+import level
+import pygame
+import sprite
+import unittest
+try:
+    import minimap
+except ImportError:  # the ui package only imports under Python 2
+    minimap = None
+
+pygame.init()
+pygame.display.set_mode((240, 320))
+
+SCALE = 10
+
+
+class Rock(sprite.Kinematic, pygame.sprite.Sprite):
+    color = (160, 160, 160)
+
+    def __init__(self, center):
+        super(Rock, self).__init__()
+        self.maprect = pygame.Rect(0, 0, 10, 10)
+        self.maprect.center = center
+        self.rect = self.maprect.copy()
+        self.velocity = [0, 0]
+        self.angular_velocity = 0
+        self.angle = 0
+
+
+class Ship(pygame.sprite.Sprite):
+    color = (0, 255, 0)
+
+    def __init__(self, center):
+        super(Ship, self).__init__()
+        self.maprect = pygame.Rect(0, 0, 10, 10)
+        self.maprect.center = center
+
+
+@unittest.skipIf(minimap is None, 'ui needs Python 2')
+class LevelMapCheck(unittest.TestCase):
+    def setUp(self):
+        self.level = level.Level(size=(640, 480))
+        self.map = minimap.LevelMap(self.level, SCALE, (0, 0),
+                                    surf=pygame.Surface((320, 240)))
+        self.topleft = self.level.cullrect.topleft
+
+    def pixel(self, x, y):
+        """Return the map pixel showing map position (x, y)."""
+        return ((x - self.topleft[0]) // SCALE,
+                (y - self.topleft[1]) // SCALE)
+
+    def add_rocks(self, num, pos):
+        for i in range(num):
+            self.level.kinematics.add(Rock(pos))
+
+    def test_empty(self):
+        image = self.map.plot()
+        self.assertEqual(image.shape, tuple(self.map.rect.size) + (3,))
+        self.assertTrue((image == self.map.bgcolor[:3]).all())
+
+    def test_dots(self):
+        self.add_rocks(minimap.DENSE - 1, (100, 100))
+        self.add_rocks(1, (300, 200))
+        ship = Ship((500, 400))
+        self.level.actors.add(ship)
+        image = self.map.plot()
+        self.assertEqual(tuple(image[self.pixel(100, 100)]), Rock.color)
+        self.assertEqual(tuple(image[self.pixel(300, 200)]), Rock.color)
+        self.assertEqual(tuple(image[self.pixel(500, 400)]), Ship.color)
+        self.assertEqual(tuple(image[self.pixel(400, 400)]),
+                         self.map.bgcolor[:3])
+
+    def test_heat(self):
+        heat = minimap.LevelMap.HEAT
+        self.add_rocks(minimap.DENSE, (100, 100))
+        self.add_rocks(2 * minimap.DENSE, (300, 200))
+        self.add_rocks(10000, (500, 400))
+        image = self.map.plot()
+        self.assertEqual(list(image[self.pixel(100, 100)]), list(heat[0]))
+        self.assertEqual(list(image[self.pixel(300, 200)]), list(heat[1]))
+        self.assertEqual(list(image[self.pixel(500, 400)]), list(heat[-1]))
+
+    def test_replot(self):
+        self.add_rocks(1, (100, 100))
+        self.map.paint()
+        self.assertFalse(self.map.dirty)
+        self.map.replot()
+        self.assertTrue(self.map.dirty)
+        self.assertEqual(tuple(self.map.image.get_at(self.pixel(100, 100))),
+                         Rock.color + (255,))
+
+suite = unittest.makeSuite(LevelMapCheck, 'test')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,14 @@
 import sys
 sys.path.append('../')
 
+import json
 import level
 import model
 import os
 import pygame
+import shutil
 import sprite
+import tempfile
 import unittest
 
 pygame.init()
@@ -27,6 +30,35 @@ class LoadCheck(unittest.TestCase):
         mdl = model.load('models/oneframe', 60)
         self.assertIsNotNone(mdl['default'])
 
+    def test_load_all(self):
+        models, seconds = model.load_all(['models/oneanim',
+                                          'models/oneframe'], 60, threads=2)
+        self.assertEqual(len(models), 2)
+        self.assertEqual(len(seconds), 2)
+        anim = models[0]['default']
+        self.assertEquals(anim.ticks_per_frame, 20)
+        self.assertEquals(len(anim.frames), 3)
+        expected = model.load('models/oneanim', 60)['default'].frames
+        for frame, original in zip(anim.frames, expected):
+            self.assertEqual(pygame.image.tostring(frame, 'RGBA'),
+                             pygame.image.tostring(original, 'RGBA'))
+        self.assertIsNotNone(models[1]['default'].frame)
+        self.assertTrue(seconds[0] > 0)
+
+    def test_load_all_bad_image(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            dirname = os.path.join(tmpdir, 'bad')
+            shutil.copytree('models/oneanim', dirname)
+            with open(os.path.join(dirname, 'model.json')) as descr:
+                frame = json.load(descr)['animations']['default']['frames'][0]
+            with open(os.path.join(dirname, frame), 'wb') as image:
+                image.write(b'not an image')
+            self.assertRaises(pygame.error, model.load_all,
+                              ['models/oneframe', dirname], 60, threads=2)
+        finally:
+            shutil.rmtree(tmpdir)
+
 suite = unittest.makeSuite(LoadCheck,'test')
 
 class ModelObjectTest(unittest.TestCase):
@@ -191,12 +223,13 @@ class ModelObjectTest(unittest.TestCase):
 
     def test_scroll(self):
         modobj = sprite.ModelObject(self.model)
-        level.Level(screen=SCREEN).add(modobj, (11, 11))
-        modobj.scroll((10, 10))
+        lvl = level.Level(screen=SCREEN)
+        lvl.add(modobj, (11, 11))
+        lvl.scroll((-10, -10))
         self.assertEquals(modobj.maprect.topleft, (0, 0))
         self.assertEquals(modobj.maprect.center, (11, 11))
-        self.assertEquals(modobj.rect.topleft, (10, 10))
-        self.assertEquals(modobj.rect.center, (21, 21))
+        self.assertEquals(modobj.rect.topleft, (0, 0))
+        self.assertEquals(lvl.to_screen(modobj.rect.center), (21, 21))
  
 ####    def test_put_at(self):
 ####        modobj = sprite.ModelObject(self.model)
@@ -0,0 +1,55 @@
+import sys
+sys.path.append('../')
+
+import pool
+import pygame
+import sprite
+import unittest
+
+
+class Dot(sprite.Pooled, pygame.sprite.Sprite):
+    def __init__(self, color='red'):
+        super(Dot, self).__init__()
+        self.color = color
+
+    def reset(self, color='red'):
+        self.color = color
+
+
+
+class PoolCheck(unittest.TestCase):
+    def setUp(self):
+        Dot.pool = pool.Pool(Dot, max_size=1)
+        self.group = pygame.sprite.Group()
+
+    def test_miss_then_hit(self):
+        first = Dot.spawn(color='blue')
+        self.group.add(first)
+        first.kill()
+        second = Dot.spawn(color='green')
+        self.assertTrue(second is first)
+        self.assertEqual(second.color, 'green')
+        self.assertEqual((Dot.pool.hits, Dot.pool.misses), (1, 1))
+
+    def test_kill_twice(self):
+        dot = Dot.spawn()
+        self.group.add(dot)
+        dot.kill()
+        dot.kill()
+        self.assertEqual(Dot.pool.free, [dot])
+
+    def test_dead_sprite_not_released(self):
+        Dot.spawn().kill()
+        self.assertEqual(Dot.pool.free, [])
+
+    def test_max_size(self):
+        dots = [Dot.spawn(), Dot.spawn()]
+        self.group.add(dots)
+        for dot in dots:
+            dot.kill()
+        self.assertEqual(len(Dot.pool.free), 1)
+
+suite = unittest.makeSuite(PoolCheck, 'test')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import sys
+sys.path.append('../')
+
+import present
+import pygame
+import unittest
+
+pygame.init()
+SCREEN = pygame.display.set_mode((240, 320))
+
+
+class PresenterCheck(unittest.TestCase):
+    def setUp(self):
+        self.presenter = present.Presenter(SCREEN, gap=0, flip_ratio=0.5)
+        self.calls = []
+        self.flip = pygame.display.flip
+        self.update = pygame.display.update
+        pygame.display.flip = lambda: self.calls.append('flip')
+        pygame.display.update = \
+            lambda rects: self.calls.append(('update', rects))
+
+    def tearDown(self):
+        pygame.display.flip = self.flip
+        pygame.display.update = self.update
+
+    def test_small(self):
+        self.presenter.present([pygame.Rect(0, 0, 10, 10),
+                                pygame.Rect(5, 5, 10, 10),
+                                pygame.Rect(100, 100, 20, 10)])
+        self.assertEqual(self.calls, [('update', [pygame.Rect(0, 0, 15, 15),
+                                                  pygame.Rect(100, 100, 20,
+                                                              10)])])
+        self.assertFalse(self.presenter.flipped)
+        self.assertEqual(self.presenter.rects, 2)
+        self.assertEqual(self.presenter.pixels, 15 * 15 + 20 * 10)
+
+    def test_clipped(self):
+        self.presenter.present([pygame.Rect(230, -10, 20, 20)])
+        self.assertEqual(self.calls, [('update', [pygame.Rect(230, 0, 10,
+                                                              10)])])
+        self.assertEqual(self.presenter.pixels, 100)
+
+    def test_large(self):
+        self.presenter.present([pygame.Rect(0, 0, 240, 160),
+                                pygame.Rect(0, 200, 10, 10)])
+        self.assertEqual(self.calls, ['flip'])
+        self.assertTrue(self.presenter.flipped)
+        self.assertEqual(self.presenter.rects, 1)
+        self.assertEqual(self.presenter.pixels, 240 * 320)
+
+    def test_threshold(self):
+        self.presenter.present([pygame.Rect(0, 0, 240, 159)])
+        self.assertFalse(self.presenter.flipped)
+        self.presenter.present([pygame.Rect(0, 0, 240, 160)])
+        self.assertTrue(self.presenter.flipped)
+
+    def test_nothing(self):
+        self.presenter.present([])
+        self.assertEqual(self.calls, [('update', [])])
+        self.assertEqual((self.presenter.rects, self.presenter.pixels),
+                         (0, 0))
+
+suite = unittest.makeSuite(PresenterCheck, 'test')
+
+if __name__ == '__main__':
+    unittest.main()
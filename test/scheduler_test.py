@@ -0,0 +1,81 @@
+import sys
+sys.path.append('../')
+
+import scheduler
+import unittest
+
+
+class FakeClock(object):
+    """ A clock that moves on by 'step' seconds each time it is read. """
+    def __init__(self, step=1.0):
+        self.now = 0.0
+        self.step = step
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+
+class SchedulerCheck(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.jobs = scheduler.Scheduler(clock=self.clock)
+        self.ran = []
+
+    def job(self, name):
+        return lambda: self.ran.append(name)
+
+    def sweep(self, name, slices):
+        def run():
+            for i in range(slices):
+                self.ran.append((name, i))
+                yield
+        return run
+
+    def test_priority(self):
+        self.jobs.add('low', self.job('low'))
+        self.jobs.add('high', self.job('high'), priority=1)
+        self.jobs.run(0, 100)
+        self.assertEqual(self.ran, ['high', 'low'])
+        self.assertEqual(self.jobs.deferred, 0)
+
+    def test_period(self):
+        self.jobs.add('often', self.job('often'))
+        self.jobs.add('seldom', self.job('seldom'), period=3)
+        for tick in range(4):
+            self.jobs.run(tick, 100)
+        self.assertEqual(self.ran.count('often'), 4)
+        self.assertEqual(self.ran.count('seldom'), 2)
+
+    def test_deadline(self):
+        self.jobs.add('a', self.job('a'), priority=1)
+        self.jobs.add('b', self.job('b'))
+        self.jobs.run(0, self.clock.now)  # out of time already
+        self.assertEqual(self.ran, ['a'])
+        self.assertEqual(self.jobs.deferred, 1)
+        self.jobs.run(1, self.clock.now)
+        self.assertEqual(self.ran, ['a', 'b'])  # b is now more overdue
+
+    def test_generator_spread(self):
+        self.jobs.add('sweep', self.sweep('sweep', 3), period=10)
+        self.jobs.run(0, self.clock.now + 2.5)
+        self.assertEqual(self.ran, [('sweep', 0), ('sweep', 1)])
+        self.assertEqual(self.jobs.times, {'sweep': 2.0})
+        self.assertEqual(self.jobs.deferred, 1)
+        self.jobs.run(1, self.clock.now + 100)
+        self.assertEqual(len(self.ran), 3)
+        self.assertEqual(self.jobs.deferred, 0)
+        # The next sweep is due a period after this one started.
+        self.jobs.run(9, self.clock.now + 100)
+        self.assertEqual(len(self.ran), 3)
+        self.jobs.run(10, self.clock.now + 100)
+        self.assertEqual(self.ran[3:], self.ran[:3])
+
+    def test_no_deadline(self):
+        self.jobs.add('sweep', self.sweep('sweep', 3), priority=1)
+        self.jobs.add('b', self.job('b'))
+        self.jobs.run(0)
+        self.assertEqual(len(self.ran), 4)
+        self.assertEqual(self.jobs.deferred, 0)
+
+suite = unittest.makeSuite(SchedulerCheck, 'test')
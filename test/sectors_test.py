@@ -0,0 +1,57 @@
+import sys
+sys.path.append('../')
+
+import pygame
+import sectors
+import unittest
+
+
+class Rock(object):
+    def __init__(self, velocity=None, angular_velocity=0):
+        self.velocity = velocity
+        self.angular_velocity = angular_velocity
+        self.angle = 0
+        self.state = None
+        self.maprect = pygame.Rect(0, 0, 10, 10)
+
+    def get_state(self):
+        return self.state
+
+    def set_state(self, state):
+        self.state = state
+
+
+class SectorStoreCheck(unittest.TestCase):
+    def setUp(self):
+        self.store = sectors.SectorStore(sector_size=100)
+
+    def add(self, pos, state=None):
+        rock = Rock(velocity=[1, 2], angular_velocity=3)
+        rock.angle = 45
+        rock.state = state
+        rock.maprect.center = pos
+        self.store.store(rock)
+
+    def test_round_trip(self):
+        self.add((150, -250), state=(1, 2))
+        self.assertEqual(len(self.store), 1)
+        self.assertEqual(list(self.store.sectors), [(1, -3)])
+        [(rock, pos)] = self.store.wake(pygame.Rect(100, -300, 100, 100))
+        self.assertEqual(pos, (150, -250))
+        self.assertEqual(rock.velocity, [1, 2])
+        self.assertEqual(rock.angular_velocity, 3)
+        self.assertEqual(rock.angle, 45)
+        self.assertEqual(rock.state, (1, 2))
+        self.assertEqual(len(self.store), 0)
+        self.assertEqual(self.store.sectors, {})
+
+    def test_wake_inside_only(self):
+        for pos in ((10, 10), (90, 90), (250, 10), (1000, 1000)):
+            self.add(pos)
+        woken = self.store.wake(pygame.Rect(0, 0, 50, 300))
+        self.assertEqual([pos for rock, pos in woken], [(10, 10)])
+        self.assertEqual(len(self.store), 3)
+        self.assertEqual(len(self.store.sectors[(0, 0)]), 1)
+        self.assertEqual(self.store.wake(pygame.Rect(0, 0, 50, 300)), [])
+
+suite = unittest.makeSuite(SectorStoreCheck, 'test')
@@ -0,0 +1,99 @@
+import sys
+sys.path.append('../')
+
+import background
+import controls
+import model
+import multiprocessing
+import os
+import pygame
+import simproc
+import sprite
+import unittest
+from multiprocessing import sharedctypes
+
+pygame.init()
+pygame.display.set_mode((240, 320))
+
+MODELDIR = os.path.join(os.path.dirname(__file__), '..', 'models')
+CLASSES = [sprite.PlayerShip, sprite.Asteroid]
+for cls, name in zip(CLASSES, ('sinistar_Bship', 'tyrian_rock1a')):
+    cls.__model__ = model.load(os.path.join(MODELDIR, name), 60)
+
+
+def build(level, controls):
+    level.add(sprite.PlayerShip(controls=controls), level.rect.center)
+    level.view(level.player)
+    rock = sprite.Asteroid(velocity=[0, 0], angular_velocity=10)
+    return level.add(rock, (level.rect.centerx + 100, level.rect.centery))
+
+
+def undock(level):
+    level.dock = None
+
+
+class Background(background.Background):
+    def blit(self, surf, rect):
+        surf.fill((0, 0, 0), rect)
+
+
+class WorkerCheck(unittest.TestCase):
+    def setUp(self):
+        self.raw = sharedctypes.RawArray(
+            'i', simproc.HEADER + simproc.MAX_RECORDS * simproc.FIELDS)
+        self.inputs = sharedctypes.RawArray('i', simproc.INPUTS)
+        self.worker = simproc.Worker(self.raw, multiprocessing.Lock(),
+                                     self.inputs, CLASSES, (640, 480), 60,
+                                     build, undock)
+
+    def test_controls(self):
+        self.inputs[simproc.POINTER_X] = 10
+        self.inputs[simproc.POINTER_Y] = 20
+        self.inputs[simproc.FIRING] = 1
+        player = self.worker.level.player
+        self.assertEqual(player.controls.pointer(), (10, 20))
+        self.assertTrue(player.controls.firing())
+        self.assertFalse(player.controls.thrusting())
+
+    def test_publish(self):
+        self.worker.level.update()
+        self.worker.publish()
+        snapshot = list(self.raw)
+        self.assertEqual(snapshot[simproc.SEQ], 1)
+        self.assertEqual(snapshot[simproc.ALIVE], 1)
+        self.assertEqual(snapshot[simproc.COUNT], 2)
+        rock = self.worker.goal
+        records = [snapshot[simproc.HEADER + i * simproc.FIELDS:
+                            simproc.HEADER + (i + 1) * simproc.FIELDS]
+                   for i in range(2)]
+        self.assertTrue([1, 0, 0, rock.quantized_angle(), rock.rect.centerx,
+                         rock.rect.centery] in records)
+
+
+class RemoteLevelCheck(unittest.TestCase):
+    def setUp(self):
+        self.screen = pygame.Surface((640, 480))
+        self.level = simproc.RemoteLevel(self.screen, Background(), CLASSES,
+                                         build, undock)
+
+    def test_no_snapshot(self):
+        self.assertTrue(self.level)
+        self.assertEqual(self.level.update(), [])
+
+    def test_draw_snapshot(self):
+        snapshot = self.level.snapshot
+        snapshot[:simproc.HEADER] = (1, 1, 100, 100, 500, 3, 0, 2, 1)
+        snapshot[simproc.HEADER:simproc.HEADER + simproc.FIELDS] = \
+            (1, 0, 0, 30, 300, 200)
+        dirty = self.level.update()
+        self.assertEqual(len(dirty), 1)
+        self.assertEqual(dirty[0].center, (200, 100))
+        self.assertEqual(self.level.ore, 3)
+        self.assertEqual(self.level.dock, simproc.UNDOCKED)
+
+suite = unittest.TestSuite()
+suite.addTest(unittest.makeSuite(WorkerCheck, 'test'))
+suite.addTest(unittest.makeSuite(RemoteLevelCheck, 'test'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import sys
+sys.path.append('../')
+
+import pygame
+import spatial
+import unittest
+
+
+class Dummy(pygame.sprite.Sprite):
+    def __init__(self, rect):
+        super(Dummy, self).__init__()
+        self.maprect = pygame.Rect(rect)
+
+
+class SpatialHashCheck(unittest.TestCase):
+    def setUp(self):
+        self.grid = spatial.SpatialHash(100)
+
+    def test_add(self):
+        spr = Dummy((10, 10, 20, 20))
+        self.grid.add(spr)
+        self.assertEqual(len(self.grid), 1)
+        self.assertEqual(list(self.grid.cells.keys()), [(0, 0)])
+
+    def test_add_straddles_cells(self):
+        spr = Dummy((90, 90, 20, 20))
+        self.grid.add(spr)
+        self.assertEqual(sorted(self.grid.cells.keys()),
+                         [(0, 0), (0, 1), (1, 0), (1, 1)])
+
+    def test_kill(self):
+        spr = Dummy((90, 90, 20, 20))
+        self.grid.add(spr)
+        spr.kill()
+        self.assertEqual(len(self.grid), 0)
+        self.assertEqual(self.grid.cells, {})
+
+    def test_reindex(self):
+        spr = Dummy((10, 10, 20, 20))
+        self.grid.add(spr)
+        spr.maprect.move_ip(500, 0)
+        self.grid.reindex(spr)
+        self.assertEqual(list(self.grid.cells.keys()), [(5, 0)])
+
+    def test_near(self):
+        close = Dummy((150, 10, 20, 20))
+        far = Dummy((1000, 1000, 20, 20))
+        self.grid.add(close, far)
+        found = self.grid.near(pygame.Rect(10, 10, 20, 20))
+        self.assertEqual(found, set([close]))
+
+    def test_near_negative_coords(self):
+        spr = Dummy((-150, -150, 20, 20))
+        self.grid.add(spr)
+        self.assertEqual(self.grid.near(pygame.Rect(-50, -50, 10, 10)),
+                         set([spr]))
+        self.assertEqual(self.grid.near(pygame.Rect(50, 50, 10, 10)), set())
+
+    def test_border(self):
+        inside = Dummy((150, 150, 20, 20))
+        edge = Dummy((10, 150, 20, 20))
+        outside = Dummy((-50, 150, 20, 20))
+        far = Dummy((-500, 150, 20, 20))
+        self.grid.add(inside, edge, outside, far)
+        found = self.grid.border(pygame.Rect(50, 50, 300, 300))
+        self.assertEqual(found, set([edge, outside]))
+
+
+suite = unittest.makeSuite(SpatialHashCheck, 'test')
+
+if __name__ == '__main__':
+    unittest.main()
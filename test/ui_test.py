@@ -0,0 +1,138 @@
+import sys
+sys.path.append('../')
+
+import level
+import perf
+import present
+import pygame
+import unittest
+try:
+    import stardog
+    import ui
+except ImportError:  # the ui package only imports under Python 2
+    ui = None
+
+pygame.init()
+SCREEN = pygame.display.set_mode((240, 320))
+
+
+class Font(object):
+    """Records what is written instead of drawing it."""
+    def __init__(self):
+        self.written = []
+
+    def get_dims(self, char):
+        return pygame.Rect(0, 0, 8, 8)
+
+    def write(self, surf, rect, text):
+        self.written.append(text)
+
+
+@unittest.skipIf(ui is None, 'ui needs Python 2')
+class WidgetCheck(unittest.TestCase):
+    def setUp(self):
+        self.font = Font()
+        self.value = 1
+        self.label = self.value_label((0, 0))
+
+    def value_label(self, pos):
+        return ui.ValueLabel(pos=pos, title='n', value_func=lambda:
+                             self.value, font=self.font, surf=SCREEN)
+
+    def test_value_label_unchanged(self):
+        self.assertEqual(self.label.tick(), [self.label.rect])
+        self.assertEqual(self.label.tick(), [])
+        self.assertEqual(self.font.written, ['n:1'])
+
+    def test_value_label_changed(self):
+        self.label.tick()
+        self.value = 2
+        self.assertEqual(self.label.tick(), [self.label.rect])
+        self.assertEqual(self.font.written, ['n:1', 'n:2'])
+
+    def test_poll_only_invalidates(self):
+        self.label.refresh()
+        self.value = 2
+        self.label.poll()
+        self.assertTrue(self.label.dirty)
+        self.assertEqual(self.font.written, ['n:1'])
+
+    def test_container(self):
+        other = self.value_label((0, 20))
+        container = ui.Container(surf=SCREEN)
+        container.rect = pygame.Rect(0, 0, 150, 40)
+        container.add(self.label)
+        container.add(other)
+        self.assertEqual(container.refresh(), [container.rect])
+        self.assertEqual(container.refresh(), [])
+        other.invalidate()
+        self.assertEqual(container.refresh(), [other.rect])
+        del self.font.written[:]
+        container.invalidate()
+        self.assertEqual(container.refresh(), [container.rect])
+        self.assertEqual(self.font.written, ['n:1', 'n:1'])
+        self.assertFalse(self.label.dirty or other.dirty)
+
+    def test_wrapper(self):
+        wrapper = ui.Wrapper(widget=self.label, surf=SCREEN)
+        wrapper.layout(pygame.Rect(0, 0, 200, 100))
+        self.assertEqual(wrapper.tick(), [wrapper.rect])
+        self.assertEqual(wrapper.tick(), [])
+        self.value = 2
+        self.assertEqual(wrapper.tick(), [self.label.rect])
+
+    def test_tick_hud(self):
+        other = self.value_label((0, 100))
+        hud = [self.label, other]
+        stardog.tick_hud(hud, [])
+        self.assertEqual(stardog.tick_hud(hud, []), [])
+        self.assertEqual(stardog.tick_hud(hud, [pygame.Rect(10, 105, 5, 5)]),
+                         [other.rect])
+        self.assertEqual(stardog.tick_hud(hud, [pygame.Rect(200, 200, 5,
+                                                            5)]), [])
+
+
+@unittest.skipIf(ui is None, 'ui needs Python 2')
+class PerfOverlayCheck(unittest.TestCase):
+    def setUp(self):
+        self.font = Font()
+        self.level = level.Level(size=(640, 480))
+        self.presenter = present.Presenter(SCREEN)
+        self.overlay = ui.PerfOverlay(level=self.level, pos=(0, 0),
+                                      font=self.font, history=4,
+                                      presenter=self.presenter, surf=SCREEN)
+
+    def frame(self):
+        """Time a frame with the level's timer as Level.update would."""
+        timer = self.level.timer
+        self.assertTrue(isinstance(timer, perf.PhaseTimer))
+        timer.start()
+        for phase in perf.PHASES:
+            timer.mark(phase)
+
+    def test_sample(self):
+        for i in range(6):
+            self.frame()
+            self.overlay.refresh()
+            self.overlay.sample()
+            self.assertTrue(self.overlay.dirty)
+        self.assertEqual(len(self.overlay.samples), 4)
+        self.assertEqual(self.overlay.samples[-1],
+                         self.level.timer.total() * 1000)
+
+    def test_paint(self):
+        self.frame()
+        self.overlay.sample()
+        self.assertEqual(self.overlay.paint(), self.overlay.rect)
+        self.assertFalse(self.overlay.dirty)
+        self.assertEqual(len(self.font.written),
+                         len(perf.PHASES) + 8)
+        self.assertEqual(self.font.written[len(perf.PHASES)], 'ticks:0')
+        self.assertTrue(self.font.written[-1].startswith('update:0'))
+
+suite = unittest.TestSuite()
+suite.addTest(unittest.makeSuite(WidgetCheck, 'test'))
+suite.addTest(unittest.makeSuite(PerfOverlayCheck, 'test'))
+
+if __name__ == '__main__':
+    unittest.main()
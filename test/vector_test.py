@@ -0,0 +1,56 @@
+import sys
+sys.path.append('../')
+
+import random
+import unittest
+import vector
+
+
+class BatchCheck(unittest.TestCase):
+    """ The batched functions must agree with the scalar ones. """
+    def setUp(self):
+        rand = random.Random(1)
+        self.angles = ([i / 4.0 for i in range(-1440, 1441)] +
+                       [rand.uniform(-10000, 10000) for i in range(1000)])
+        self.vectors = ([(x, y) for x in range(-3, 4) for y in range(-3, 4)] +
+                        [vector.from_angle(a) for a in self.angles] +
+                        [(rand.uniform(-5, 5), rand.uniform(-5, 5))
+                         for i in range(1000)])
+
+    def test_add(self):
+        other = list(reversed(self.vectors))
+        batch = vector.batch_add(self.vectors, other).tolist()
+        for v2, v1, row in zip(self.vectors, other, batch):
+            self.assertEqual(list(vector.add(v2, v1)), row)
+
+    def test_subtract(self):
+        other = list(reversed(self.vectors))
+        batch = vector.batch_subtract(self.vectors, other).tolist()
+        for v2, v1, row in zip(self.vectors, other, batch):
+            self.assertEqual(list(vector.subtract(v2, v1)), row)
+
+    def test_scalar_multiply(self):
+        batch = vector.batch_scalar_multiply(self.vectors, 3).tolist()
+        for v, row in zip(self.vectors, batch):
+            self.assertEqual(list(vector.scalar_multiply(v, 3)), row)
+
+    def test_normalize(self):
+        batch = vector.batch_normalize(self.vectors).tolist()
+        for v, row in zip(self.vectors, batch):
+            self.assertEqual(list(vector.normalize(v)), row)
+
+    def test_to_angle(self):
+        batch = vector.batch_to_angle(self.vectors).tolist()
+        for v, angle in zip(self.vectors, batch):
+            self.assertEqual(vector.to_angle(v), angle)
+
+    def test_from_angle(self):
+        batch = vector.batch_from_angle(self.angles).tolist()
+        for angle, row in zip(self.angles, batch):
+            self.assertEqual(list(vector.from_angle(angle)), row)
+
+
+suite = unittest.makeSuite(BatchCheck, 'test')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,4 +9,5 @@ from button import Button
 from runnable import Runnable
 from okdialog import OkDialog
 from optiondialog import OptionDialog
+from perfoverlay import PerfOverlay
 
@@ -20,8 +20,10 @@ class Button(Wrapper):
     def mouseover(self, pos):
         self.bgcolor = self.ON_COLOR
         self.widget.bgcolor = self.ON_COLOR
+        self.invalidate()
         return self
 
     def mouseoff(self):
         self.bgcolor = self.OFF_COLOR
         self.widget.bgcolor = self.OFF_COLOR
+        self.invalidate()
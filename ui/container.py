@@ -28,6 +28,16 @@ class Container(Widget):
             widget.paint(**kwargs)
         return self.rect
 
+    def refresh(self, **kwargs):
+        """ Repaint everything if the container itself is dirty, else just
+        the dirty widgets in it. """
+        if self.dirty:
+            return [self.paint(**kwargs)]
+        dirty = []
+        for widget in self.contents:
+            dirty += widget.refresh(**kwargs)
+        return dirty
+
     def layout(self, max_rect):
         self.size = 0
         for widget in self.contents:
@@ -47,5 +57,7 @@ class Container(Widget):
             widget.move(offset)
 
     def tick(self):
+        dirty = []
         for widget in self.contents:
-            widget.tick()
+            dirty += widget.tick()
+        return dirty
@@ -13,4 +13,5 @@ class Frame(Wrapper):
         #import pdb; pdb.set_trace()
         self.surf.blit(self.image, self.rect)
         self.widget.paint(**kwargs)
+        self.dirty = False
         return self.rect
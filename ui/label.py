@@ -9,9 +9,27 @@ class Label(Widget):
         super(Label, self).__init__(**kwargs)
         self.font = font
         self.text = text
-        self.lines = []
+
+    @property
+    def text(self):
+        return self._text
+
+    @text.setter
+    def text(self, text):
+        """ Changing the text invalidates the label and its layout. """
+        self._text = text
+        self.layout_cache = None
+        self.invalidate()
 
     def layout(self, maxrect):
+        """ Fit the text into 'maxrect', reusing the last layout if neither
+        the text nor 'maxrect' has changed since. """
+        key = tuple(maxrect)
+        if self.layout_cache and self.layout_cache[0] == key:
+            self.rect = self.layout_cache[1].copy()
+            self.lines = list(self.layout_cache[2])
+            return self.rect
+        self.lines = []
         self.rect = pygame.Rect((maxrect.topleft), (0, 0))
         x = maxrect.left
         y = maxrect.top
@@ -35,6 +53,7 @@ class Label(Widget):
         if line != '':
             self.lines.append(line)
             self.rect.height += chrect.height
+        self.layout_cache = key, self.rect.copy(), list(self.lines)
         return self.rect
 
     def paint(self, **kwargs):
@@ -0,0 +1,89 @@
+import budget
+import collections
+import perf
+import pygame
+from . import Widget
+
+BUDGET = 1000.0 / 60  # milliseconds per frame at 60 fps
+UNDER_COLOR = (0, 192, 0)
+OVER_COLOR = (255, 0, 0)
+BUDGET_COLOR = (255, 255, 0)
+
+
+class PerfOverlay(Widget):
+    """ Shows the time taken by each phase of the last Level.update, the
+    number of ticks it ran, the collision test counts, the number of visible
+    sprites, the scheduled jobs left waiting, how full the entity budget is
+    and how often it has turned sprites away, what the presenter (if any)
+    last sent to the display and a rolling graph of frame times. """
+
+    LINE_HEIGHT = 20
+    GRAPH_HEIGHT = 60
+
+    def __init__(self, level=None, pos=None, font=None, history=180,
+                 presenter=None, **kwargs):
+        super(PerfOverlay, self).__init__(**kwargs)
+        self.level = level
+        self.presenter = presenter
+        self.font = font
+        self.samples = collections.deque(maxlen=history)
+        lines = len(perf.PHASES) + 7 + (presenter is not None)
+        self.rect = pygame.Rect(pos, (max(history, 200),
+                                      lines * self.LINE_HEIGHT +
+                                      self.GRAPH_HEIGHT))
+
+    def lines(self):
+        timer = self.level.timer
+        for phase in perf.PHASES:
+            yield '{}:{:.2f}'.format(phase, timer.phases[phase] * 1000)
+        yield 'ticks:{}'.format(self.level.substeps)
+        yield 'rects:{}'.format(timer.counts['rect_tests'])
+        yield 'masks:{}'.format(timer.counts['mask_tests'])
+        yield 'visible:{}'.format(len(self.level.hot_group))
+        yield 'deferred:{}'.format(self.level.scheduler.deferred)
+        entities = self.level.budget
+        yield 'budget:{} {}%'.format(len(entities),
+                                     int(entities.pressure() * 100))
+        yield 'def:{} drop:{} evict:{}'.format(
+            *[sum(entities.pressure_counts[outcome].values())
+              for outcome in (budget.DEFER, budget.DROP, budget.EVICT)])
+        if self.presenter:
+            presenter = self.presenter
+            yield '{}:{} {}kpx'.format(
+                'flip' if presenter.flipped else 'update', presenter.rects,
+                presenter.pixels // 1000)
+
+    def paint(self, **kwargs):
+        super(PerfOverlay, self).paint(**kwargs)
+        line_rect = pygame.Rect(self.rect.topleft,
+                                (self.rect.width, self.LINE_HEIGHT))
+        for line in self.lines():
+            self.font.write(self.surf, line_rect, line)
+            line_rect.top += self.LINE_HEIGHT
+        self.paint_graph(pygame.Rect(line_rect.topleft,
+                                     (self.rect.width, self.GRAPH_HEIGHT)))
+        return self.rect
+
+    def paint_graph(self, rect):
+        """ Draw a bar per frame time, scaled so that the frame budget is
+        halfway up. """
+        scale = rect.height / (2 * BUDGET)
+        x = rect.left
+        for sample in self.samples:
+            height = min(int(sample * scale), rect.height)
+            if height:
+                color = UNDER_COLOR if sample <= BUDGET else OVER_COLOR
+                self.surf.fill(color, (x, rect.bottom - height, 1, height))
+            x += 1
+        y = rect.bottom - int(BUDGET * scale)
+        pygame.draw.line(self.surf, BUDGET_COLOR, (rect.left, y),
+                         (rect.right - 1, y))
+
+    def sample(self):
+        """ Record the last frame's time and invalidate. """
+        self.samples.append(self.level.timer.total() * 1000)
+        self.invalidate()
+
+    def tick(self):
+        self.sample()
+        return self.refresh()
@@ -15,8 +15,7 @@ class Runnable(object):
         undermouse = None
         saved_background = self.surf.copy()
         while self.running:
-            dirtyrect = self.paint(show_boxes=False)
-            pygame.display.update(dirtyrect)
+            pygame.display.update(self.refresh(show_boxes=False))
             event = pygame.event.wait()
             if event.type == pygame.MOUSEBUTTONDOWN:
                 self.onclick(event.pos)
@@ -12,8 +12,13 @@ class ValueLabel(Label):
         self.rect = pygame.Rect((pos), (150, 20))
         self.text = '{}:{}'.format(self.title, self.value_func())
 
+    def poll(self):
+        """ Update the text, invalidating the label only if the value has
+        changed. """
+        text = '{}:{}'.format(self.title, self.value_func())
+        if text != self.text:
+            self.text = text
+
     def tick(self):
-        self.text = '{}:{}'.format(self.title, self.value_func())
-        self.paint()
-        return self.rect
-        #pygame.display.update(self.rect)
+        self.poll()
+        return self.refresh()
@@ -3,18 +3,37 @@ import pygame
 
 
 class Widget(object):
+    """ Base of the widget tree. Widgets are only repainted when they have
+    been invalidated since they were last painted; see refresh(). """
 
     def __init__(self, surf=None, bgcolor=DEFAULT_BGCOLOR):
         self.surf = surf
         self.rect = pygame.Rect(0, 0, 0, 0)
         self.bgcolor = bgcolor
+        self.dirty = True
+
+    def invalidate(self):
+        """ Mark the widget as needing to be repainted. """
+        self.dirty = True
 
     def paint(self, show_boxes=False):
         self.surf.fill(self.bgcolor, self.rect)
         if show_boxes:
             pygame.draw.rect(self.surf, (255, 255, 255), self.rect, 1)
+        self.dirty = False
         return self.rect
 
+    def refresh(self, **kwargs):
+        """ Repaint the widget if it is dirty. Returns the list of rects
+        painted, which is empty if nothing was. """
+        if self.dirty:
+            return [self.paint(**kwargs)]
+        return []
+
+    def tick(self):
+        """ Bring the widget up to date for this frame and refresh it. """
+        return self.refresh()
+
     def layout(self, max_rect):
         return self.rect
 
@@ -17,6 +17,16 @@ class Wrapper(Container):
         self.widget.paint(**kwargs)
         return self.rect
 
+    def refresh(self, **kwargs):
+        if self.dirty:
+            return [self.paint(**kwargs)]
+        return self.widget.refresh(**kwargs)
+
+    def tick(self):
+        if self.dirty:
+            return self.refresh()
+        return self.widget.tick()
+
     def layout(self, maxrect):
         self.rect = maxrect.copy()
         self.widget.layout(maxrect.inflate(-2 * DEFAULT_BORDER,
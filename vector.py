@@ -1,5 +1,6 @@
 import random as _random
 import math
+import numpy
 
 def normalize(v):
     """ Normalize a vector so that the max component is 1. """
@@ -202,6 +203,105 @@ def from_angle(degrees, acc=3):
         else:
             return x, -1
 
+# Batched versions of the functions above. Each takes an (N, 2) array of
+# vectors or an N-length array of angles and gives the same results, row for
+# row, as the scalar version.
+
+def _batch_round(x, acc=0):
+    """ Round like the built-in round(), which breaks ties away from zero in
+    Python 2 but to even (like numpy.round) in Python 3. """
+    if round(0.5) == 0:
+        return numpy.round(x, acc)
+    scale = 10.0 ** acc
+    return numpy.sign(x) * numpy.floor(numpy.abs(x) * scale + 0.5) / scale
+
+def batch_add(v2, v1):
+    """ Return v2 + v1 for each row.
+
+    >>> batch_add([[1, 2], [3, 4]], [[10, 20], [30, 40]]).tolist()
+    [[11, 22], [33, 44]]
+    """
+    return numpy.add(v2, v1)
+
+def batch_subtract(v2, v1):
+    """ Return v2 - v1 for each row.
+
+    >>> batch_subtract([[10, 20], [30, 40]], [[1, 2], [3, 4]]).tolist()
+    [[9, 18], [27, 36]]
+    """
+    return numpy.subtract(v2, v1)
+
+def batch_scalar_multiply(v, s):
+    """ Multiply each row by a scalar, or by the matching entry of an
+    N-length array of scalars.
+
+    >>> batch_scalar_multiply([[1, 2], [3, 4]], 2).tolist()
+    [[2, 4], [6, 8]]
+    >>> batch_scalar_multiply([[1, 2], [3, 4]], [2, 3]).tolist()
+    [[2, 4], [9, 12]]
+    """
+    return numpy.multiply(v, numpy.reshape(s, (-1, 1)))
+
+def batch_normalize(v):
+    """ Normalize each row so that its max component is 1. Rows of zeros are
+    left alone.
+
+    >>> batch_normalize([[3, -6], [0, 0], [2, 1]]).tolist()
+    [[0.5, -1.0], [0.0, 0.0], [1.0, 0.5]]
+    """
+    vout = numpy.array(v, dtype=float)
+    ms = numpy.abs(vout).max(axis=1)
+    nonzero = ms != 0
+    vout[nonzero] /= ms[nonzero, numpy.newaxis]
+    return vout
+
+def batch_to_angle(v):
+    """ Convert each row to degrees as to_angle() does.
+
+    >>> batch_to_angle([[0, -1], [-0.577, -1], [-1, 0.0], [1, 1.0]]).tolist()
+    [0, 30, 90, 225]
+    """
+    v = numpy.asarray(v, dtype=float)
+    dx = v[:, 0]
+    dy = v[:, 1]
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        angle = numpy.degrees(numpy.arctan(dx / dy))
+    angle = numpy.where(dy > 0, 180 + angle, (360 + angle) % 360)
+    angle = numpy.where(dx == 0, numpy.where(dy < 0, 0, 180), angle)
+    angle = numpy.where(dy == 0, numpy.where(dx > 0, 270, 90), angle)
+    return _batch_round(angle).astype(int)
+
+def batch_from_angle(degrees, acc=3):
+    """ Convert each angle in degrees to a normalized vector as from_angle()
+    does.
+
+    >>> batch_from_angle([0, 30, 90, 180, 225, 330, -390]).tolist()
+    ... # doctest: +NORMALIZE_WHITESPACE
+    [[0.0, -1.0], [-0.577, -1.0], [-1.0, 0.0], [0.0, 1.0], [1.0, 1.0],
+     [0.577, -1.0], [0.577, -1.0]]
+    """
+    degrees = numpy.mod(360 - numpy.asarray(degrees, dtype=float), 360)
+    tan = _batch_round(numpy.tan(numpy.radians(degrees)), acc)
+    east = (degrees >= 0) & (degrees <= 180)
+    zero = tan == 0
+    steep = numpy.abs(tan) >= 1
+    vout = numpy.empty((len(degrees), 2))
+    # 0 means an angle near 0 or 180 degrees.
+    vout[:, 0] = 0
+    vout[:, 1] = numpy.where(_batch_round(degrees) % 360 == 0, -1, 1)
+    # |x|>|y| so normalize on |x|
+    with numpy.errstate(divide='ignore'):
+        y = _batch_round(-1 / tan, acc)
+    pick = steep & ~zero
+    vout[pick, 0] = numpy.where(east, 1, -1)[pick]
+    vout[pick, 1] = numpy.where(east, y, -y)[pick]
+    # |y|>|x| so normalize on |y|
+    pick = ~steep & ~zero
+    vout[pick, 0] = numpy.where(east, numpy.abs(tan), -numpy.abs(tan))[pick]
+    vout[pick, 1] = numpy.where((degrees >= 90) & (degrees <= 270),
+                                1, -1)[pick]
+    return vout
+
 if __name__ == "__main__":
     import doctest
     doctest.testmod()